@@ -12,71 +12,153 @@ Then update docker-compose.yml to use:
     LLM_API_ENDPOINT=http://host.docker.internal:7000/v1/chat/completions
 """
 
-from flask import Flask, request, Response
-import requests
+from contextlib import asynccontextmanager
+import asyncio
+import atexit
+import logging
+import logging.handlers
 import os
-import urllib3
+import pathlib
+import queue
+import re
 
-# Suppress SSL warnings for internal network
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+import httpx
+import orjson
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
-app = Flask(__name__)
+# Log through a queue so formatting and stdout writes happen on a background thread
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
-def _read_env_file(key: str) -> str:
-    """Read a value from .env file as fallback."""
-    try:
-        with open(".env") as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith(f"{key}="):
-                    return line.split("=", 1)[1].strip()
-    except FileNotFoundError:
-        pass
-    return ""
+logging.root.addHandler(logging.handlers.QueueHandler(_log_queue))
+logging.root.setLevel(logging.INFO)
+logging.getLogger("httpx").setLevel(logging.WARNING)  # Skip per-request client logs
+logger = logging.getLogger("proxy")
+
+
+def _read_env_file() -> str:
+    """Read the whole .env file (empty string if missing)."""
+    path = pathlib.Path(".env")
+    return path.read_text(errors="ignore") if path.is_file() else ""
+
+
+_ENV_FILE = _read_env_file()
+
+
+def _env_file_value(key: str) -> str:
+    """Look up a value from the .env file as fallback."""
+    match = re.search(rf"^\s*{re.escape(key)}=(.*)$", _ENV_FILE, re.MULTILINE)
+    return match.group(1).strip() if match else ""
 
 # External API configuration - all values from environment
-API_URL = os.getenv("LLM_API_BASE_URL") or _read_env_file("LLM_API_BASE_URL")
-TOKEN = os.getenv("LLM_API_TOKEN") or _read_env_file("LLM_API_TOKEN")
+API_URL = os.getenv("LLM_API_BASE_URL") or _env_file_value("LLM_API_BASE_URL")
+TOKEN = os.getenv("LLM_API_TOKEN") or _env_file_value("LLM_API_TOKEN")
 
 if not API_URL:
-    print("WARNING: LLM_API_BASE_URL not set. Proxy cannot forward requests.")
+    logger.warning("LLM_API_BASE_URL not set. Proxy cannot forward requests.")
 if not TOKEN:
-    print("WARNING: LLM_API_TOKEN not set. Requests will likely fail.")
+    logger.warning("LLM_API_TOKEN not set. Requests will likely fail.")
+
+# Connection pool with certificate verification disabled once, up front
+# (skip SSL verification for internal network)
+TRANSPORT = httpx.AsyncHTTPTransport(
+    verify=False,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+    retries=3  # Reconnect on connection failures
+)
+
+# Transient upstream statuses retried over the warm connection, with exponential backoff
+RETRY_STATUSES = {502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.2
+
+# Shared async client keeps connections to the LLM API alive across requests
+CLIENT = httpx.AsyncClient(
+    transport=TRANSPORT,
+    timeout=120,
+    headers={
+        "Authorization": f"Bearer {TOKEN}",
+        "Content-Type": "application/json"
+    }
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the TLS connection on startup and close the client on shutdown."""
+    if API_URL:
+        # /v1/models is the cheap, read-only OpenAI-compatible listing endpoint
+        try:
+            await CLIENT.get(f"{API_URL}/v1/models", timeout=10)
+        except httpx.HTTPError as e:
+            logger.warning("Could not reach %s/v1/models: %s", API_URL, e)
+    yield
+    await CLIENT.aclose()
+
+
+app = FastAPI(title="LLM API Proxy", lifespan=lifespan)
+
+def _payload_model(body: bytes) -> str:
+    """Pull the model name out of a chat payload (only parsed when inspected)."""
+    try:
+        return orjson.loads(body).get("model", "?")
+    except (orjson.JSONDecodeError, AttributeError):
+        return "?"
+
 
-@app.route('/v1/chat/completions', methods=['POST'])
-def proxy_chat_completions():
+@app.post('/v1/chat/completions')
+async def proxy_chat_completions(request: Request) -> Response:
     """Forward chat completion requests to external API."""
-    print(f"[PROXY] Received POST to /v1/chat/completions from {request.remote_addr}")
-    print(f"[PROXY] Content-Type: {request.content_type}")
-    print(f"[PROXY] Headers: {dict(request.headers)}")
+    client_host = request.client.host if request.client else "?"
     try:
-        print(f"[PROXY] Forwarding to {API_URL}/v1/chat/completions")
+        # Forward the body untouched - it is only parsed when debug logging inspects it
+        body = await request.body()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("proxy model=%s headers=%s", _payload_model(body), request.headers)
         
-        resp = requests.post(
+        upstream = CLIENT.build_request(
+            "POST",
             f"{API_URL}/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {TOKEN}",
-                "Content-Type": "application/json"
-            },
-            json=request.json,
-            verify=False,  # Skip SSL verification for internal network
-            timeout=120
+            content=body,
+            headers={"Content-Type": request.headers.get("content-type", "application/json")}
         )
+        for attempt in range(MAX_RETRIES + 1):
+            resp = await CLIENT.send(upstream, stream=True)
+            if resp.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            await resp.aclose()
+            logger.warning("proxy upstream status=%s, retry %d/%d", resp.status_code, attempt + 1, MAX_RETRIES)
+            await asyncio.sleep(BACKOFF_SECONDS * 2 ** attempt)
         
-        print(f"Response status: {resp.status_code}")
+        logger.info("proxy %s -> %s/v1/chat/completions status=%s", client_host, API_URL, resp.status_code)
         
-        return Response(
-            resp.content,
-            status=resp.status_code,
-            content_type=resp.headers.get('Content-Type', 'application/json')
+        # Relay chunks as they arrive so SSE completions keep their token-by-token pacing
+        return StreamingResponse(
+            resp.aiter_bytes(),
+            status_code=resp.status_code,
+            media_type=resp.headers.get('Content-Type', 'application/json'),
+            background=BackgroundTask(resp.aclose)
         )
         
+    except httpx.TimeoutException as e:
+        logger.error("proxy %s -> %s/v1/chat/completions timeout=%s", client_host, API_URL, e)
+        return JSONResponse({"error": f"Upstream timed out: {e}"}, status_code=504)
+    except httpx.TransportError as e:
+        logger.error("proxy %s -> %s/v1/chat/completions error=%s", client_host, API_URL, e)
+        return JSONResponse({"error": f"Upstream unreachable: {e}"}, status_code=502)
     except Exception as e:
-        print(f"Proxy error: {e}")
-        return {"error": str(e)}, 500
+        # Anything else (building the request, reading the body) still answers in JSON
+        logger.exception("proxy %s -> %s/v1/chat/completions failed=%s", client_host, API_URL, e)
+        return JSONResponse({"error": str(e)}, status_code=500)
 
-@app.route('/health', methods=['GET'])
-def health():
+@app.get('/health')
+async def health() -> dict:
     """Health check endpoint."""
     return {"status": "ok", "proxy": "LLM API Proxy"}
 
@@ -93,4 +175,5 @@ if __name__ == '__main__':
     print("=" * 60)
     print()
     
-    app.run(host='0.0.0.0', port=7000, debug=False)
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=7000, workers=1)
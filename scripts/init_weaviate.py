@@ -10,12 +10,14 @@ Run this script once after starting Weaviate for the first time.
 """
 
 import sys
-from typing import Optional
+import traceback
+from typing import Dict, Iterable, Optional, Set
 
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
-
-sys.path.insert(0, '/app/src')
+from weaviate.classes.tenants import Tenant
+from weaviate.collections import Collection
+from weaviate.util import generate_uuid5
 
 from utils.config import WEAVIATE_URL
 from utils.logging_config import setup_logging
@@ -60,25 +62,32 @@ def connect_to_weaviate() -> weaviate.WeaviateClient:
         sys.exit(1)
 
 
-def create_document_collection(client: weaviate.WeaviateClient) -> None:
+def create_document_collection(client: weaviate.WeaviateClient, existing: Set[str]) -> Collection:
     """
     Create the Document collection for RAG with multi-tenancy.
     
     Each company (HPE, Toyota, Microsoft) will be a separate tenant.
+    
+    Args:
+        client: Connected Weaviate client
+        existing: Names of collections that already exist
+        
+    Returns:
+        Handle to the Document collection
     """
     collection_name = "Document"
     
     try:
         # Check if collection already exists
-        if client.collections.exists(collection_name):
+        if collection_name in existing:
             logger.warning(f"Collection '{collection_name}' already exists. Skipping creation.")
-            return
+            return client.collections.get(collection_name)
         
         logger.info(f"Creating collection: {collection_name}")
         
         # Create collection without vectorizer (external LLM API doesn't provide embeddings)
         # Note: For RAG to work, you'll need to separately configure an embedding service
-        client.collections.create(
+        collection = client.collections.create(
             name=collection_name,
             
             # Multi-tenancy for per-company isolation
@@ -120,21 +129,54 @@ def create_document_collection(client: weaviate.WeaviateClient) -> None:
         )
         
         logger.info(f"✅ Created collection: {collection_name}")
+        return collection
         
     except Exception as e:
         logger.error(f"❌ Failed to create collection '{collection_name}': {e}")
         raise
 
 
-def create_conversation_collection(client: weaviate.WeaviateClient) -> None:
+def bulk_ingest(collection: Collection, tenant: str, chunks: Iterable[Dict]) -> int:
+    """
+    Insert document chunks into a tenant using Weaviate's dynamic batcher.
+    
+    Ingestion scripts should use this instead of per-object `data.insert` calls:
+    the dynamic batcher sizes requests from server feedback, and deterministic
+    UUIDs make re-runs idempotent (no duplicate chunks on retry).
+    
+    Args:
+        collection: Document collection handle
+        tenant: Tenant (company) name
+        chunks: Property dicts with content, source, chunk_index and metadata
+        
+    Returns:
+        Number of objects that failed to insert
+    """
+    tenant_collection = collection.with_tenant(tenant)
+    
+    with tenant_collection.batch.dynamic() as batch:
+        for props in chunks:
+            batch.add_object(properties=props, uuid=generate_uuid5(props))
+    
+    failed = tenant_collection.batch.failed_objects
+    if failed:
+        logger.error(f"❌ {len(failed)} objects failed to insert into tenant '{tenant}'")
+    return len(failed)
+
+
+def create_conversation_collection(client: weaviate.WeaviateClient, existing: Set[str]) -> None:
     """
     Create the ConversationHistory collection for storing conversation logs.
+    
+    Args:
+        client: Connected Weaviate client
+        existing: Names of collections that already exist
     """
     collection_name = "ConversationHistory"
     
     try:
         # Check if collection already exists
-        if client.collections.exists(collection_name):
+        if collection_name in existing:
             logger.warning(f"Collection '{collection_name}' already exists. Skipping creation.")
             return
         
@@ -199,24 +241,21 @@ def create_conversation_collection(client: weaviate.WeaviateClient) -> None:
         raise
 
 
-def create_tenants(client: weaviate.WeaviateClient) -> None:
+def create_tenants(collection: Collection) -> None:
     """
     Create initial tenants for the Document collection.
     
     Creates tenants for: HPE, Toyota, Microsoft
+    
+    Args:
+        collection: Document collection handle
     """
-    collection_name = "Document"
     companies = ["HPE", "Toyota", "Microsoft"]
     
     try:
         logger.info("Creating tenants for Document collection")
         
-        # Get the collection
-        collection = client.collections.get(collection_name)
-        
         # Create tenants
-        from weaviate.classes.tenants import Tenant
-        
         tenants = [Tenant(name=company) for company in companies]
         collection.tenants.create(tenants)
         
@@ -227,31 +266,31 @@ def create_tenants(client: weaviate.WeaviateClient) -> None:
         raise
 
 
-def verify_setup(client: weaviate.WeaviateClient) -> None:
-    """Verify that all collections were created successfully."""
+def verify_setup(client: weaviate.WeaviateClient, document_collection: Collection) -> None:
+    """Verify that all collections were created successfully.
+    
+    Args:
+        client: Connected Weaviate client
+        document_collection: Document collection handle
+    """
     logger.info("Verifying setup...")
     
     try:
-        # List all collections
+        # List all collections (v4 returns a dict keyed by collection name)
         collections = client.collections.list_all()
-        # In v4, list_all() returns dict with collection names as keys
-        collection_names = list(collections.keys())
-        
-        logger.info(f"Found collections: {', '.join(collection_names)}")
+        logger.info("Found collections: %s", list(collections))
         
         # Check Document collection tenants
-        document_collection = client.collections.get("Document")
         tenants_list = document_collection.tenants.get()
         # In v4, tenants_list items can be strings or Tenant objects
         tenant_names = [t if isinstance(t, str) else t.name for t in tenants_list]
         
-        logger.info(f"Document collection tenants: {', '.join(tenant_names)}")
+        logger.info("Document collection tenants: %s", tenant_names)
         
         logger.info("✅ Setup verification complete")
         
     except Exception as e:
         logger.error(f"❌ Verification failed: {e}")
-        import traceback
         logger.error(traceback.format_exc())
         raise
 
@@ -268,15 +307,18 @@ def main() -> None:
         # Connect to Weaviate
         client = connect_to_weaviate()
         
+        # Fetch the schema once instead of probing each collection separately
+        existing = set(client.collections.list_all().keys())
+        
         # Create collections
-        create_document_collection(client)
-        create_conversation_collection(client)
+        document_collection = create_document_collection(client, existing)
+        create_conversation_collection(client, existing)
         
         # Create tenants
-        create_tenants(client)
+        create_tenants(document_collection)
         
         # Verify setup
-        verify_setup(client)
+        verify_setup(client, document_collection)
         
         logger.info("=" * 60)
         logger.info("✅ Weaviate initialization complete!")
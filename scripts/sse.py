@@ -0,0 +1,29 @@
+"""
+Server-Sent Events helper shared by the API test scripts.
+"""
+
+from typing import Dict, Iterator
+
+import orjson
+import requests
+
+
+def iter_sse_events(response: requests.Response) -> Iterator[Dict]:
+    """Yield the JSON payload of each `data:` event in a streaming response.
+    
+    Splits the raw byte stream on blank-line event boundaries and parses each
+    payload straight from bytes, so there is no per-line UTF-8 decode.
+    
+    Args:
+        response: Response opened with stream=True
+        
+    Yields:
+        Decoded event payloads
+    """
+    buffer = b""
+    for chunk in response.iter_content(chunk_size=None):
+        buffer += chunk
+        *events, buffer = buffer.split(b"\n\n")
+        for event in events:
+            if event.startswith(b"data: "):
+                yield orjson.loads(event[6:])
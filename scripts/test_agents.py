@@ -5,19 +5,16 @@ Simple test script to verify agents can talk to each other.
 Run: docker-compose exec app python scripts/test_agents.py
 """
 
-import sys
 import time
 import logging
 
-sys.path.insert(0, '/app/src')
-
 from utils.config import DEFAULT_MODEL
 from utils.logging_config import setup_logging
 
 # Set up logging to see what's happening
 setup_logging()
 
-from agents.core import Agent, MultiAgentOrchestrator
+from agents import Agent, MultiAgentOrchestrator
 
 logger = logging.getLogger(__name__)
 
@@ -4,27 +4,37 @@ Quick integration test for The Grid API endpoints.
 Tests API structure without waiting for full LLM responses.
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import json
 
 API_URL = "http://localhost:8000"
 
+# One keep-alive session per worker thread (requests.Session isn't thread-safe)
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    """Return the calling thread's session, creating it on first use."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
 
 def test_health():
     """Test health endpoint."""
-    print("✅ Testing health endpoint...", end=" ")
-    response = requests.get(f"{API_URL}/")
+    response = session().get(f"{API_URL}/")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ok"
     assert data["service"] == "The Grid API"
-    print("PASSED")
+    print("✅ Testing health endpoint... PASSED")
 
 
 def test_create_conversation():
     """Test creating a conversation."""
-    print("✅ Testing conversation creation...", end=" ")
-    response = requests.post(
+    response = session().post(
         f"{API_URL}/conversations",
         json={
             "scenario": "Quick integration test",
@@ -37,38 +47,42 @@ def test_create_conversation():
     data = response.json()
     assert "conversation_id" in data
     conv_id = data["conversation_id"]
-    print(f"PASSED (ID: {conv_id[:8]}...)")
+    print(f"✅ Testing conversation creation... PASSED (ID: {conv_id[:8]}...)")
     return conv_id
 
 
 def test_get_conversation(conv_id):
     """Test getting conversation details."""
-    print("✅ Testing conversation retrieval...", end=" ")
-    response = requests.get(f"{API_URL}/conversations/{conv_id}")
+    response = session().get(f"{API_URL}/conversations/{conv_id}")
     assert response.status_code == 200
     data = response.json()
     assert data["scenario"] == "Quick integration test"
     assert data["client"] == "Toyota"
     assert data["status"] == "created"
-    print("PASSED")
+    print("✅ Testing conversation retrieval... PASSED")
 
 
 def test_delete_conversation(conv_id):
     """Test deleting a conversation."""
-    print("✅ Testing conversation deletion...", end=" ")
-    response = requests.delete(f"{API_URL}/conversations/{conv_id}")
+    response = session().delete(f"{API_URL}/conversations/{conv_id}")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "deleted"
-    print("PASSED")
+    print("✅ Testing conversation deletion... PASSED")
 
 
 def test_404():
     """Test 404 for non-existent conversation."""
-    print("✅ Testing 404 handling...", end=" ")
-    response = requests.get(f"{API_URL}/conversations/nonexistent-id")
+    response = session().get(f"{API_URL}/conversations/nonexistent-id")
     assert response.status_code == 404
-    print("PASSED")
+    print("✅ Testing 404 handling... PASSED")
+
+
+def test_conversation_lifecycle():
+    """Test create -> get -> delete (sequential, they share the conversation ID)."""
+    conv_id = test_create_conversation()
+    test_get_conversation(conv_id)
+    test_delete_conversation(conv_id)
 
 
 if __name__ == "__main__":
@@ -77,11 +91,11 @@ if __name__ == "__main__":
     print("=" * 60)
     
     try:
-        test_health()
-        conv_id = test_create_conversation()
-        test_get_conversation(conv_id)
-        test_delete_conversation(conv_id)
-        test_404()
+        # Independent probes overlap; result() re-raises any assertion failure
+        with ThreadPoolExecutor() as pool:
+            futures = [pool.submit(test) for test in (test_health, test_404, test_conversation_lifecycle)]
+            for future in futures:
+                future.result()
         
         print("\n" + "=" * 60)
         print("✅ ALL QUICK TESTS PASSED")
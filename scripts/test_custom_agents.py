@@ -5,6 +5,8 @@ Test custom agent creation functionality.
 import requests
 import json
 
+from sse import iter_sse_events
+
 API_URL = "http://localhost:8000"
 
 def test_custom_agent_api():
@@ -38,13 +40,9 @@ def test_custom_agent_api():
     
     # Check messages
     agents_seen = set()
-    for line in response.iter_lines():
-        if line:
-            line_str = line.decode('utf-8')
-            if line_str.startswith('data: '):
-                data = json.loads(line_str[6:])
-                if 'agent' in data:
-                    agents_seen.add(data['agent'])
+    for data in iter_sse_events(response):
+        if 'agent' in data:
+            agents_seen.add(data['agent'])
     
     if 'Pinote' in agents_seen and 'Sarah' in agents_seen:
         print(f"   ✅ Custom agent 'Pinote' and library agent 'Sarah' both participated")
@@ -69,33 +67,31 @@ def test_assistant_custom_agent():
     
     # Parse response for config
     config = None
-    for line in response.text.split('\n'):
-        if 'data:' in line:
-            try:
-                data = json.loads(line.split('data: ', 1)[1])
-                msg = data.get('message', '')
-                # Find JSON config in message
-                if '"ready"' in msg and '"agents"' in msg:
-                    # Extract JSON - find the last complete JSON object
-                    start_idx = msg.rfind('{"ready"')
-                    if start_idx >= 0:
-                        # Find matching closing brace
-                        brace_count = 0
-                        end_idx = start_idx
-                        for i in range(start_idx, len(msg)):
-                            if msg[i] == '{':
-                                brace_count += 1
-                            elif msg[i] == '}':
-                                brace_count -= 1
-                                if brace_count == 0:
-                                    end_idx = i + 1
-                                    break
-                        if end_idx > start_idx:
-                            config = json.loads(msg[start_idx:end_idx])
-                            break
-            except Exception as e:
-                print(f"   Debug: Failed to parse: {e}")
-                pass
+    for data in iter_sse_events(response):
+        try:
+            msg = data.get('message', '')
+            # Find JSON config in message
+            if '"ready"' in msg and '"agents"' in msg:
+                # Extract JSON - find the last complete JSON object
+                start_idx = msg.rfind('{"ready"')
+                if start_idx >= 0:
+                    # Find matching closing brace
+                    brace_count = 0
+                    end_idx = start_idx
+                    for i in range(start_idx, len(msg)):
+                        if msg[i] == '{':
+                            brace_count += 1
+                        elif msg[i] == '}':
+                            brace_count -= 1
+                            if brace_count == 0:
+                                end_idx = i + 1
+                                break
+                    if end_idx > start_idx:
+                        config = json.loads(msg[start_idx:end_idx])
+                        break
+        except Exception as e:
+            print(f"   Debug: Failed to parse: {e}")
+            pass
     
     if not config:
         print("   ❌ No config generated")
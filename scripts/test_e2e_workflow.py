@@ -13,7 +13,7 @@ import sys
 import requests
 import json
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from sse import iter_sse_events
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 
@@ -42,12 +42,10 @@ def test_full_workflow():
     
     # Parse assistant response
     assistant_msg_1 = None
-    for line in response.text.strip().split('\n'):
-        if line.startswith('data: '):
-            data = json.loads(line[6:])
-            assistant_msg_1 = data.get('message', '')
-            print(f"Assistant: {assistant_msg_1[:100]}...")
-            break
+    for data in iter_sse_events(response):
+        assistant_msg_1 = data.get('message', '')
+        print(f"Assistant: {assistant_msg_1[:100]}...")
+        break
     
     if not assistant_msg_1:
         print("❌ FAILED: No assistant response")
@@ -80,21 +78,19 @@ def test_full_workflow():
     # Parse assistant response and look for JSON config
     assistant_msg_2 = None
     config = None
-    for line in response.text.strip().split('\n'):
-        if line.startswith('data: '):
-            data = json.loads(line[6:])
-            assistant_msg_2 = data.get('message', '')
-            print(f"Assistant: {assistant_msg_2[:100]}...")
-            
-            # Extract JSON config
-            if '{' in assistant_msg_2 and '}' in assistant_msg_2:
-                try:
-                    start = assistant_msg_2.index('{')
-                    end = assistant_msg_2.rindex('}') + 1
-                    config = json.loads(assistant_msg_2[start:end])
-                except:
-                    pass
-            break
+    for data in iter_sse_events(response):
+        assistant_msg_2 = data.get('message', '')
+        print(f"Assistant: {assistant_msg_2[:100]}...")
+        
+        # Extract JSON config
+        if '{' in assistant_msg_2 and '}' in assistant_msg_2:
+            try:
+                start = assistant_msg_2.index('{')
+                end = assistant_msg_2.rindex('}') + 1
+                config = json.loads(assistant_msg_2[start:end])
+            except:
+                pass
+        break
     
     if not config or not config.get('ready'):
         print("❌ FAILED: No valid config generated")
@@ -126,15 +122,11 @@ def test_full_workflow():
     # Count messages
     message_count = 0
     agent_names = set()
-    for line in response.iter_lines():
-        if line:
-            line_str = line.decode('utf-8')
-            if line_str.startswith('data: '):
-                data = json.loads(line_str[6:])
-                if 'agent' in data:
-                    message_count += 1
-                    agent_names.add(data['agent'])
-                    print(f"  Turn {data.get('turn')}: {data['agent']} speaking...")
+    for data in iter_sse_events(response):
+        if 'agent' in data:
+            message_count += 1
+            agent_names.add(data['agent'])
+            print(f"  Turn {data.get('turn')}: {data['agent']} speaking...")
     
     print(f"\n✅ Scenario completed: {message_count} messages from {len(agent_names)} agents\n")
     
@@ -7,10 +7,8 @@ Tests the assistant chat and scenario start endpoints.
 import os
 import sys
 import requests
-import json
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from sse import iter_sse_events
 
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 
@@ -33,14 +31,11 @@ def test_assistant_chat():
         return False
     
     # Parse SSE stream
-    lines = response.text.strip().split('\n')
     found_message = False
-    for line in lines:
-        if line.startswith('data: '):
-            data = json.loads(line[6:])
-            if 'message' in data and len(data['message']) > 0:
-                found_message = True
-                break
+    for data in iter_sse_events(response):
+        if 'message' in data and len(data['message']) > 0:
+            found_message = True
+            break
     
     if found_message:
         print("PASSED ✅")
@@ -72,13 +67,9 @@ def test_scenario_start():
     
     # Check we get at least one message
     message_count = 0
-    for line in response.iter_lines():
-        if line:
-            line_str = line.decode('utf-8')
-            if line_str.startswith('data: '):
-                data = json.loads(line_str[6:])
-                if 'agent' in data and 'message' in data:
-                    message_count += 1
+    for data in iter_sse_events(response):
+        if 'agent' in data and 'message' in data:
+            message_count += 1
     
     if message_count >= 1:
         print(f"PASSED ✅ ({message_count} messages)")
@@ -1,10 +1,11 @@
 """
 Agent classes for multi-agent conversations.
 
-Public API: Agent, HumanAgent, MultiAgentOrchestrator
+Public API: Agent, HumanAgent, MultiAgentOrchestrator, ResponseCache, Turn
 """
 
-from .base import Agent, HumanAgent
+from .base import Agent, HumanAgent, Turn
+from .cache import ResponseCache
 from .orchestrator import MultiAgentOrchestrator
 
-__all__ = ['Agent', 'HumanAgent', 'MultiAgentOrchestrator']
+__all__ = ['Agent', 'HumanAgent', 'MultiAgentOrchestrator', 'ResponseCache', 'Turn']
@@ -4,49 +4,188 @@ Agent base classes.
 Simple AI agents that respond using external LLM API.
 """
 
+import asyncio
+import functools
 import logging
-import requests
-import urllib3
-from typing import List, Dict, Optional
+import statistics
+import time
+import orjson
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import TYPE_CHECKING, AsyncGenerator, List, Dict, Optional, Generator
 
-from utils.config import LLM_API_ENDPOINT, LLM_API_TOKEN, DEFAULT_MODEL
+from utils.config import LLM_ENDPOINTS, LLM_API_TOKEN, DEFAULT_MODEL
+from .cache import ResponseCache, cache_key
+from .endpoints import EndpointPool
 
-# Suppress SSL warnings for internal network API
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
+# Calls are spread over every configured endpoint, least-busy first;
+# shared with the API's assistant chat
+ENDPOINT_POOL = EndpointPool(LLM_ENDPOINTS)
 
+# httpx is imported on first LLM call, so HumanAgent-only or import-only
+# consumers don't pay for it at startup.
+
+
+def _transport_options() -> Dict:
+    """Connection-pool settings shared by the sync and async transports."""
+    import httpx
+    
+    return {
+        "http2": True,  # Concurrent calls multiplex over one connection per endpoint
+        "limits": httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        "retries": 2,  # Reconnect on connection errors; the proxy retries upstream 5xx
+        "verify": False  # Skip SSL verification for internal network
+    }
+
+
+def _client_options() -> Dict:
+    """Request defaults shared by the sync and async clients."""
+    import httpx
+    
+    return {
+        "headers": {
+            "Content-Type": "application/json",
+            **({"Authorization": f"Bearer {LLM_API_TOKEN}"} if LLM_API_TOKEN else {})
+        },
+        "timeout": httpx.Timeout(60, connect=10)  # 1 minute for network API
+    }
+
+
+@functools.cache
+def llm_client() -> "httpx.Client":
+    """Return the shared sync LLM client, so each call skips the TCP/TLS handshake."""
+    import httpx
+    
+    return httpx.Client(transport=httpx.HTTPTransport(**_transport_options()), **_client_options())
+
+
+# Agent system prompt template, with .format bound once. The shared guidelines
+# come first so every agent's prompt starts with the same bytes, letting
+# servers with prefix caching reuse them; only the persona differs.
+_SYSTEM_PROMPT = """You are taking part in a simulated business conversation.
+
+Guidelines:
+- Stay in character as the person described below
+- Be professional and realistic
+- Keep responses concise (2-3 sentences)
+- Focus on your objective
+- Respond naturally as if in a business conversation
+
+You are {name}, a {role} at {company}.
+Your objective: {objective}""".format
+
+# Shared async clients. httpx connections are bound to the loop that opened them, so keep one client per loop.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _async_client() -> "httpx.AsyncClient":
+    """Return the shared async client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None:
+        import httpx
+        
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(**_transport_options()),
+            **_client_options()
+        )
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Close the running loop's shared async client, e.g. on server shutdown."""
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+@dataclass(slots=True, frozen=True)
+class Turn:
+    """One message in a conversation, as recorded by the orchestrator (immutable once recorded)."""
+    
+    turn: int
+    agent: str
+    company: str
+    role: str
+    message: str
+    generation_time: Optional[float] = None
+    timestamp_ns: int = field(default_factory=time.time_ns)
+    
+    def to_dict(self) -> Dict:
+        """Serialize for callers and the API, formatting the timestamp only here.
+        
+        Returns:
+            Message dict with an ISO 8601 'timestamp'
+        """
+        return {
+            "turn": self.turn,
+            "agent": self.agent,
+            "company": self.company,
+            "role": self.role,
+            "message": self.message,
+            "timestamp": datetime.fromtimestamp(self.timestamp_ns / 1e9).isoformat(),
+            "generation_time": self.generation_time
+        }
+
+
+@dataclass(slots=True, eq=False)
 class Agent:
     """
     Simple AI agent that responds using external LLM API.
     
     No RAG, no complex tools - just basic conversation.
+    
+    Attributes:
+        name: Agent's name
+        company: Company the agent represents
+        role: Agent's professional role
+        objective: What the agent is trying to achieve
+        model: LLM model to use (default from env)
+        cache: Optional response cache to short-circuit identical requests
+        max_tokens: Ceiling for generated tokens per response
+        context_window: Most recent turns sent to the LLM (None sends all)
+        is_human: Always False; lets the orchestrator filter agents without isinstance
     """
     
-    def __init__(
-        self,
-        name: str,
-        company: str,
-        role: str,
-        objective: str,
-        model: Optional[str] = None
-    ) -> None:
-        """Initialize an agent.
+    name: str
+    company: str
+    role: str
+    objective: str
+    model: Optional[str] = None
+    cache: Optional[ResponseCache] = None
+    max_tokens: int = 150
+    context_window: Optional[int] = 20
+    is_human: bool = field(default=False, init=False)
+    _system_message: Dict = field(init=False, repr=False)
+    _msg_cache: List[Dict] = field(init=False, repr=False)
+    _history_ref: Optional[List[Turn]] = field(init=False, repr=False)
+    _user_id: str = field(init=False, repr=False)
+    _recent_lengths: deque = field(init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self.model = self.model or DEFAULT_MODEL
         
-        Args:
-            name: Agent's name
-            company: Company the agent represents
-            role: Agent's professional role
-            objective: What the agent is trying to achieve
-            model: LLM model to use (default from env)
-        """
-        self.name = name
-        self.company = company
-        self.role = role
-        self.objective = objective
-        self.model = model or DEFAULT_MODEL
+        # Prompt depends only on the fields above, which are read-only after init
+        self._system_message = {"role": "system", "content": self._build_system_prompt()}
+        
+        # Messages built so far for the history list we last saw; extended in place each turn
+        self._msg_cache = [self._system_message]
+        self._history_ref = None
+        
+        # Stable per-agent id so prefix-caching backends can route repeat prompts together
+        self._user_id = f"{self.company}/{self.name}"
+        
+        # Approximate token counts of recent replies, used to size max_tokens
+        self._recent_lengths = deque(maxlen=16)
         
     def _build_system_prompt(self) -> str:
         """Generate system prompt for this agent.
@@ -54,40 +193,90 @@ class Agent:
         Returns:
             System prompt string
         """
-        return f"""You are {self.name}, a {self.role} at {self.company}.
-
-Your objective: {self.objective}
+        return _SYSTEM_PROMPT(
+            name=self.name,
+            role=self.role,
+            company=self.company,
+            objective=self.objective
+        )
 
-Guidelines:
-- Stay in character as {self.name}
-- Be professional and realistic
-- Keep responses concise (2-3 sentences)
-- Focus on your objective
-- Respond naturally as if in a business conversation"""
-
-    def _build_messages(self, conversation_history: List[Dict]) -> List[Dict]:
+    def _build_messages(self, conversation_history: List[Turn]) -> List[Dict]:
         """Build messages array for OpenAI-compatible API.
         
+        Only history entries added since the previous call are converted; the
+        cache restarts when a different (or truncated) history list comes in.
+        The full history is kept, but at most the last context_window turns are sent.
+        
         Args:
-            conversation_history: List of messages with 'agent' and 'message' keys
+            conversation_history: Prior turns of the conversation
             
         Returns:
             Messages array for LLM API call
         """
-        messages = [
-            {"role": "system", "content": self._build_system_prompt()}
-        ]
+        seen = len(self._msg_cache) - 1
+        if conversation_history is not self._history_ref or len(conversation_history) < seen:
+            self._msg_cache = [self._system_message]
+            self._history_ref = conversation_history
+            seen = 0
         
-        # Add conversation history
-        for msg in conversation_history:
-            # Determine if this message is from us or others
-            role = "assistant" if msg['agent'] == self.name else "user"
-            messages.append({
-                "role": role,
-                "content": msg['message']
-            })
+        # Add new conversation history; our own turns are "assistant", everyone else's "user"
+        name = self.name
+        self._msg_cache.extend(
+            {"role": "assistant" if msg.agent == name else "user", "content": msg.message}
+            for msg in conversation_history[seen:]
+        )
         
-        return messages
+        # Only the latest turns go to the LLM, bounding prompt size on long runs.
+        # Old turns are dropped in blocks of a quarter window, so the sent prefix stays
+        # byte-identical (and prompt-cacheable server side) between jumps.
+        # Slicing also copies, so concurrent callers never see the cache grow under them.
+        window = self.context_window
+        count = len(self._msg_cache) - 1
+        if window and count > window:
+            step = max(1, window // 4)
+            drop = -(-(count - window) // step) * step
+            return [self._system_message, *self._msg_cache[1 + drop:]]
+        return list(self._msg_cache)
+    
+    def _max_tokens(self) -> int:
+        """Size the generation budget from this agent's recent reply lengths.
+        
+        Generation time is linear in output tokens, so once a few replies
+        have been seen the cap tracks their P95 (with headroom) instead of
+        always reserving the full ceiling.
+        
+        Returns:
+            max_tokens value for the next request
+        """
+        if len(self._recent_lengths) < 4:
+            return self.max_tokens
+        p95 = statistics.quantiles(self._recent_lengths, n=20)[-1]
+        return min(self.max_tokens, max(64, int(p95 * 1.2) + 32))
+    
+    def _record_length(self, message: str) -> None:
+        """Remember a reply's approximate token count (~4 tokens per 3 words)."""
+        self._recent_lengths.append(len(message.split()) * 4 // 3)
+    
+    def _build_payload(self, messages: List[Dict]) -> Dict:
+        """Build the OpenAI-compatible request body.
+        
+        The messages prefix (system prompt + earlier turns) is byte-identical
+        across an agent's calls, so servers with prefix caching (e.g. vLLM)
+        only process the newly appended turns.
+        
+        Args:
+            messages: Messages array for LLM
+            
+        Returns:
+            JSON-serializable request body
+        """
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self._max_tokens(),
+            "temperature": 0.7,
+            "user": self._user_id
+        }
     
     def _call_llm_api(self, messages: List[Dict]) -> Dict:
         """Make HTTP call to external LLM API.
@@ -101,89 +290,353 @@ Guidelines:
         Raises:
             RuntimeError: If request fails or times out
         """
+        import httpx
+        
+        payload = self._build_payload(messages)
+        key = cache_key(payload) if self.cache else None
+        if key and (cached := self.cache.get(key)) is not None:
+            logger.info(f"{self.name}: cache hit")
+            return cached
+        
         logger.info(f"{self.name} generating response...")
         
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {LLM_API_TOKEN}"
-        }
+        try:
+            with ENDPOINT_POOL.acquire() as endpoint:
+                response = llm_client().post(
+                    endpoint.url,
+                    content=orjson.dumps(payload),
+                    headers=endpoint.headers
+                )
+            response.raise_for_status()
+            result = orjson.loads(response.content)
+            if key:
+                self.cache.set(key, result)
+            return result
+            
+        except httpx.TimeoutException:
+            logger.error(f"{self.name}: Request timed out after 60s")
+            raise RuntimeError(f"Agent {self.name} timed out waiting for LLM response")
+        except httpx.HTTPError as e:
+            logger.error(f"{self.name}: HTTP error: {e}")
+            raise RuntimeError(f"Agent {self.name} failed to connect to LLM: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"{self.name}: Invalid JSON response: {e}")
+            raise RuntimeError(f"Agent {self.name} received invalid response from LLM")
+
+    async def _acall_llm_api(self, messages: List[Dict]) -> Dict:
+        """Async variant of `_call_llm_api` using the shared httpx client.
+        
+        Args:
+            messages: Messages array for LLM
+            
+        Returns:
+            Response JSON from API
+            
+        Raises:
+            RuntimeError: If request fails or times out
+        """
+        import httpx
+        
+        payload = self._build_payload(messages)
+        key = cache_key(payload) if self.cache else None
+        if key and (cached := self.cache.get(key)) is not None:
+            logger.info(f"{self.name}: cache hit")
+            return cached
+        
+        logger.info(f"{self.name} generating response...")
         
         try:
-            response = requests.post(
-                LLM_API_ENDPOINT,
-                headers=headers,
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "max_tokens": 150,
-                    "temperature": 0.7
-                },
-                timeout=60,  # 1 minute for network API
-                verify=False  # Skip SSL verification for internal network
-            )
+            with ENDPOINT_POOL.acquire() as endpoint:
+                response = await _async_client().post(
+                    endpoint.url,
+                    content=orjson.dumps(payload),
+                    headers=endpoint.headers
+                )
             response.raise_for_status()
-            return response.json()
+            result = orjson.loads(response.content)
+            if key:
+                self.cache.set(key, result)
+            return result
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"{self.name}: Request timed out after 60s")
             raise RuntimeError(f"Agent {self.name} timed out waiting for LLM response")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"{self.name}: HTTP error: {e}")
             raise RuntimeError(f"Agent {self.name} failed to connect to LLM: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error(f"{self.name}: Invalid JSON response: {e}")
+            raise RuntimeError(f"Agent {self.name} received invalid response from LLM")
 
-    def respond(self, conversation_history: List[Dict]) -> tuple[str, float]:
+    def _stream_llm_api(self, messages: List[Dict]) -> Generator[str, None, None]:
+        """Stream a completion from the LLM API, yielding content deltas.
+        
+        Args:
+            messages: Messages array for LLM
+            
+        Yields:
+            Text fragments as the LLM produces them
+            
+        Raises:
+            RuntimeError: If request fails or times out
+        """
+        import httpx
+        
+        payload = self._build_payload(messages)
+        payload["stream"] = True
+        
+        logger.info(f"{self.name} streaming response...")
+        
+        try:
+            with ENDPOINT_POOL.acquire() as endpoint, llm_client().stream(
+                "POST",
+                endpoint.url,
+                content=orjson.dumps(payload),
+                headers=endpoint.headers
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    data = line[6:]
+                    if data == "[DONE]":
+                        break
+                    delta = self._parse_stream_chunk(data)
+                    if delta:
+                        yield delta
+                        
+        except httpx.TimeoutException:
+            logger.error(f"{self.name}: Request timed out after 60s")
+            raise RuntimeError(f"Agent {self.name} timed out waiting for LLM response")
+        except httpx.HTTPError as e:
+            logger.error(f"{self.name}: HTTP error: {e}")
+            raise RuntimeError(f"Agent {self.name} failed to connect to LLM: {e}")
+
+    async def _astream_llm_api(self, messages: List[Dict]) -> AsyncGenerator[str, None]:
+        """Async variant of `_stream_llm_api` using the shared httpx client.
+        
+        Args:
+            messages: Messages array for LLM
+            
+        Yields:
+            Text fragments as the LLM produces them
+            
+        Raises:
+            RuntimeError: If request fails or times out
+        """
+        import httpx
+        
+        payload = self._build_payload(messages)
+        payload["stream"] = True
+        
+        logger.info(f"{self.name} streaming response...")
+        
+        try:
+            with ENDPOINT_POOL.acquire() as endpoint:
+                async with _async_client().stream(
+                    "POST",
+                    endpoint.url,
+                    content=orjson.dumps(payload),
+                    headers=endpoint.headers
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        data = line[6:]
+                        if data == "[DONE]":
+                            break
+                        delta = self._parse_stream_chunk(data)
+                        if delta:
+                            yield delta
+                        
+        except httpx.TimeoutException:
+            logger.error(f"{self.name}: Request timed out after 60s")
+            raise RuntimeError(f"Agent {self.name} timed out waiting for LLM response")
+        except httpx.HTTPError as e:
+            logger.error(f"{self.name}: HTTP error: {e}")
+            raise RuntimeError(f"Agent {self.name} failed to connect to LLM: {e}")
+
+    def _parse_stream_chunk(self, data: str) -> Optional[str]:
+        """Extract the content delta from one streamed completion chunk.
+        
+        Args:
+            data: JSON payload of a `data:` line
+            
+        Returns:
+            Text fragment, or None if the chunk carries no content
+            
+        Raises:
+            RuntimeError: If the chunk is malformed
+        """
+        try:
+            choices = orjson.loads(data)['choices']
+            # Usage-only chunks (stream_options) carry no choices
+            return choices[0]['delta'].get('content') if choices else None
+        except (ValueError, KeyError, IndexError) as e:
+            logger.error(f"{self.name}: Invalid stream chunk: {e}")
+            raise RuntimeError(f"Agent {self.name} received invalid response from LLM")
+
+    def _parse_response(self, result: Dict) -> str:
+        """Extract the message text from an OpenAI-compatible response.
+        
+        Args:
+            result: Response JSON from API
+            
+        Returns:
+            Stripped response message
+            
+        Raises:
+            RuntimeError: If the response is empty or malformed
+        """
+        try:
+            message = result['choices'][0]['message']['content'].strip()
+        except (KeyError, IndexError, AttributeError) as e:
+            logger.error(f"{self.name}: Invalid response format: {e}")
+            raise RuntimeError(f"Agent {self.name} received invalid response from LLM")
+        
+        if not message:
+            logger.error(f"{self.name}: Received empty response")
+            raise RuntimeError(f"Agent {self.name} received empty response from LLM")
+        
+        return message
+
+    def respond(self, conversation_history: List[Turn]) -> tuple[str, float]:
         """
         Generate a response based on conversation history.
         
         Args:
-            conversation_history: List of messages with 'agent' and 'message' keys
+            conversation_history: Prior turns of the conversation
             
         Returns:
             Tuple of (response message, generation time in seconds)
         """
-        start_time = datetime.now()
+        start = time.perf_counter()
         
         # Build and send request
         messages = self._build_messages(conversation_history)
         result = self._call_llm_api(messages)
+        message = self._parse_response(result)
+        self._record_length(message)
         
-        # Parse response (OpenAI-compatible format)
-        try:
-            message = result['choices'][0]['message']['content'].strip()
+        # Calculate generation time
+        generation_time = time.perf_counter() - start
+        
+        logger.info(f"{self.name}: {message[:50]}... [SUCCESS] ({generation_time:.2f}s)")
+        return message, generation_time
+
+    def respond_stream(self, conversation_history: List[Turn]) -> Generator[str, None, None]:
+        """
+        Stream a response token-by-token instead of waiting for the full reply.
+        
+        Args:
+            conversation_history: Prior turns of the conversation
             
-            if not message:
-                logger.error(f"{self.name}: Received empty response")
-                raise RuntimeError(f"Agent {self.name} received empty response from LLM")
+        Yields:
+            Text fragments of the response, in order
+        """
+        messages = self._build_messages(conversation_history)
+        parts = []
+        for delta in self._stream_llm_api(messages):
+            parts.append(delta)
+            yield delta
+        self._record_length("".join(parts))
+
+    async def arespond_stream(self, conversation_history: List[Turn]) -> AsyncGenerator[str, None]:
+        """
+        Async variant of `respond_stream`, so streaming a turn doesn't hold a thread.
+        
+        Args:
+            conversation_history: Prior turns of the conversation
             
-            # Calculate generation time
-            generation_time = (datetime.now() - start_time).total_seconds()
+        Yields:
+            Text fragments of the response, in order
+        """
+        messages = self._build_messages(conversation_history)
+        parts = []
+        async for delta in self._astream_llm_api(messages):
+            parts.append(delta)
+            yield delta
+        self._record_length("".join(parts))
+
+    async def arespond(self, conversation_history: List[Turn]) -> tuple[str, float]:
+        """
+        Async variant of `respond` so independent calls can overlap their network wait.
+        
+        Args:
+            conversation_history: Prior turns of the conversation
             
-            logger.info(f"{self.name}: {message[:50]}... [SUCCESS] ({generation_time:.2f}s)")
-            return message, generation_time
+        Returns:
+            Tuple of (response message, generation time in seconds)
+        """
+        start = time.perf_counter()
+        
+        messages = self._build_messages(conversation_history)
+        result = await self._acall_llm_api(messages)
+        message = self._parse_response(result)
+        self._record_length(message)
+        
+        generation_time = time.perf_counter() - start
+        
+        logger.info(f"{self.name}: {message[:50]}... [SUCCESS] ({generation_time:.2f}s)")
+        return message, generation_time
+
+    async def arespond_many(
+        self,
+        histories: List[List[Turn]],
+        max_concurrency: int = 8
+    ) -> List[str]:
+        """
+        Respond to several independent conversations concurrently.
+        
+        Requests are issued together (up to max_concurrency in flight) so a
+        backend with parallel slots or continuous batching can serve them in
+        shared forward passes.
+        
+        Args:
+            histories: One conversation history per request
+            max_concurrency: Maximum requests in flight at once
             
-        except (KeyError, ValueError) as e:
-            logger.error(f"{self.name}: Invalid response format: {e}")
-            raise RuntimeError(f"Agent {self.name} received invalid response from LLM")
+        Returns:
+            Response messages, in the same order as histories
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _one(history: List[Turn]) -> str:
+            async with semaphore:
+                message, _ = await self.arespond(history)
+                return message
+        
+        return await asyncio.gather(*(_one(history) for history in histories))
+
+    def respond_many(self, histories: List[List[Turn]], max_concurrency: int = 8) -> List[str]:
+        """Blocking wrapper around `arespond_many` for callers without an event loop."""
+        async def run() -> List[str]:
+            try:
+                return await self.arespond_many(histories, max_concurrency)
+            finally:
+                # asyncio.run closes this loop on return; close its client with it
+                await aclose_async_client()
+        
+        return asyncio.run(run())
 
 
+@dataclass(slots=True, eq=False)
 class HumanAgent:
     """
     Human participant in conversation.
     
     For now, just a placeholder - actual human input handled by UI.
+    
+    Attributes:
+        name: Human's name
+        company: Company the human represents
+        role: Human's professional role
+        objective: What the human is trying to achieve
     """
     
-    def __init__(self, name: str, company: str, role: str, objective: str) -> None:
-        """Initialize a human agent.
-        
-        Args:
-            name: Human's name
-            company: Company the human represents
-            role: Human's professional role
-            objective: What the human is trying to achieve
-        """
-        self.name = name
-        self.company = company
-        self.role = role
-        self.objective = objective
-        self.is_human = True
+    name: str
+    company: str
+    role: str
+    objective: str
+    is_human: bool = field(default=True, init=False)
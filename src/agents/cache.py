@@ -0,0 +1,100 @@
+"""
+Exact-match response cache for LLM calls.
+
+Keys hash the full request body (model, messages, sampling params), so a hit
+only happens when the LLM would see byte-identical input.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import orjson
+
+
+def cache_key(payload: Dict) -> str:
+    """Hash a request body into a stable cache key.
+    
+    Args:
+        payload: JSON-serializable request body
+        
+    Returns:
+        SHA-256 hex digest of the canonical JSON encoding
+    """
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class ResponseCache:
+    """
+    Thread-safe in-memory LRU cache with a per-entry TTL.
+    
+    Opt-in: a hit replays an earlier reply, which only matches a fresh call
+    when sampling is deterministic (temperature 0) or repeats are acceptable.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600) -> None:
+        """Initialize the cache.
+        
+        Args:
+            maxsize: Maximum entries kept before evicting least recently used
+            ttl: Default time-to-live in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries over maxsize."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class DiskResponseCache:
+    """
+    ResponseCache-compatible cache persisted on disk with diskcache.
+    
+    Survives restarts and is shared by every process using the same directory;
+    diskcache evicts least recently stored entries once size_limit is reached.
+    """
+    
+    def __init__(self, directory: str, ttl: float = 3600, size_limit: int = 2**30) -> None:
+        """Initialize the cache.
+        
+        Args:
+            directory: Cache directory (created if missing)
+            ttl: Default time-to-live in seconds
+            size_limit: Maximum size on disk in bytes
+        """
+        import diskcache
+        
+        self.ttl = ttl
+        self._cache = diskcache.Cache(directory, size_limit=size_limit)
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        return self._cache.get(key)
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value with a TTL."""
+        self._cache.set(key, value, expire=ttl or self.ttl)
@@ -0,0 +1,58 @@
+"""
+LLM endpoint pool.
+
+Spreads agent calls across several configured endpoints/tokens so one
+endpoint's rate or concurrency limit doesn't cap the whole simulation.
+"""
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Sequence, Tuple
+
+
+@dataclass(slots=True, eq=False)
+class Endpoint:
+    """One LLM endpoint and its in-flight request count."""
+    
+    url: str
+    token: str
+    outstanding: int = 0
+    headers: Dict[str, str] = field(init=False)
+    
+    def __post_init__(self) -> None:
+        # Endpoints without their own token fall back to the session default
+        self.headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+
+class EndpointPool:
+    """
+    Least-outstanding dispatcher over a fixed set of endpoints.
+    
+    Safe to share between threads and between coroutines on one loop.
+    """
+    
+    def __init__(self, endpoints: Sequence[Tuple[str, str]]) -> None:
+        """Initialize the pool.
+        
+        Args:
+            endpoints: (url, token) pairs; must not be empty
+        """
+        self._endpoints = [Endpoint(url, token) for url, token in endpoints]
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def acquire(self) -> Iterator[Endpoint]:
+        """Reserve the endpoint with the fewest requests in flight.
+        
+        Yields:
+            Endpoint to send the request to; released on exit
+        """
+        with self._lock:
+            endpoint = min(self._endpoints, key=lambda ep: ep.outstanding)
+            endpoint.outstanding += 1
+        try:
+            yield endpoint
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
@@ -4,14 +4,37 @@ Multi-agent conversation orchestrator.
 Manages round-robin turn-taking between agents.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Optional, Generator
-from datetime import datetime
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from itertools import cycle, islice
+from typing import AsyncGenerator, List, Dict, Optional, Generator, Tuple
 
-from .base import HumanAgent
+from utils.config import MAX_TURNS
+from .base import Turn
+from .cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Phrases that signal the conversation has reached its end
+_COMPLETION_KEYWORDS: tuple[str, ...] = (
+    "deal", "agreed", "agreement", "signed", "approved",
+    "contract", "goodbye", "thank you for your time"
+)
+
+# One alternation: the regex engine scans the message once and stops at the
+# first whole-word hit, with IGNORECASE instead of a lowercased copy
+_COMPLETION_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, _COMPLETION_KEYWORDS)) + r")\b",
+    re.IGNORECASE
+)
+
+# Shared across orchestrators so re-running a scenario can replay earlier replies
+_REPLAY_CACHE = ResponseCache(maxsize=1024, ttl=3600)
+
 
 class MultiAgentOrchestrator:
     """
@@ -20,17 +43,61 @@ class MultiAgentOrchestrator:
     Simple implementation: agents take turns until max_turns or conversation ends.
     """
     
-    def __init__(self, agents: List, max_turns: int = 30) -> None:
+    # Minimum interval between streamed delta events, to keep per-token overhead down
+    STREAM_FLUSH_SECONDS = 0.05
+    
+    def __init__(
+        self,
+        agents: List,
+        max_turns: int = MAX_TURNS,
+        parallel_within_round: bool = False,
+        cache_enabled: bool = False
+    ) -> None:
         """
         Initialize orchestrator.
         
         Args:
             agents: List of Agent or HumanAgent instances
             max_turns: Maximum conversation turns
+            parallel_within_round: In `arun_streaming`, generate a whole round of
+                agents concurrently from the same context instead of one by one
+            cache_enabled: Reuse replies for identical prompts (same agent, same
+                context) across orchestrators; agents with their own cache keep it
+            
+        Raises:
+            ValueError: If no agent can respond autonomously
         """
+        if cache_enabled:
+            # Attach the shared cache to copies, so it doesn't outlive this
+            # orchestrator on the caller's agents
+            agents = [
+                replace(a, cache=_REPLAY_CACHE) if not a.is_human and a.cache is None else a
+                for a in agents
+            ]
+        
         self.agents = agents
         self.max_turns = max_turns
-        self.conversation_history = []
+        self.parallel_within_round = parallel_within_round
+        self.conversation_history: List[Turn] = []
+        
+        # Human agents are skipped in autonomous mode, so rotate over the LLM agents only
+        self._llm_agents = tuple(a for a in agents if not a.is_human)
+        if not self._llm_agents:
+            raise ValueError("Need at least one non-human agent")
+    
+    def _start_offset(self, initial_message: Optional[str]) -> int:
+        """Index into the LLM agents where round-robin starts.
+        
+        With an initial message (spoken by agents[0]), rotation starts at the
+        next LLM agent after agents[0], matching the original turn order.
+        
+        Args:
+            initial_message: Starting message, if any
+            
+        Returns:
+            Offset into the LLM agent list for turn 1
+        """
+        return 1 if initial_message and not self.agents[0].is_human else 0
     
     def _add_initial_message(self, initial_message: Optional[str]) -> bool:
         """Add initial message to conversation history.
@@ -44,17 +111,42 @@ class MultiAgentOrchestrator:
         if not initial_message:
             return False
             
-        self.conversation_history.append({
-            "turn": 0,
-            "agent": self.agents[0].name,
-            "company": self.agents[0].company,
-            "role": self.agents[0].role,
-            "message": initial_message,
-            "timestamp": datetime.now().isoformat()
-        })
+        self.conversation_history.append(Turn(
+            turn=0,
+            agent=self.agents[0].name,
+            company=self.agents[0].company,
+            role=self.agents[0].role,
+            message=initial_message
+        ))
         return True
     
-    def _execute_turn(self, current_agent, turn: int) -> Optional[Dict]:
+    def _record_turn(self, current_agent, turn: int, response: str, generation_time: float) -> Turn:
+        """Append a completed turn to the history.
+        
+        Args:
+            current_agent: Agent that produced the response
+            turn: Current turn number
+            response: Response message
+            generation_time: Seconds spent generating
+            
+        Returns:
+            Recorded turn
+        """
+        msg = Turn(
+            turn=turn,
+            agent=current_agent.name,
+            company=current_agent.company,
+            role=current_agent.role,
+            message=response,
+            generation_time=generation_time
+        )
+        
+        self.conversation_history.append(msg)
+        logger.info(f"Turn {turn}: {current_agent.name} completed ({generation_time:.2f}s)")
+        
+        return msg
+    
+    def _execute_turn(self, current_agent, turn: int) -> Turn:
         """Execute a single conversation turn.
         
         Args:
@@ -62,35 +154,158 @@ class MultiAgentOrchestrator:
             turn: Current turn number
             
         Returns:
-            Message dict if successful, None if agent is human
+            Recorded turn
             
         Raises:
             Exception: If agent response fails
         """
-        # Skip human agents in autonomous mode
-        if isinstance(current_agent, HumanAgent):
-            logger.info(f"Skipping human agent: {current_agent.name}")
-            return None
-        
         # Generate response
         logger.info(f"Turn {turn}: {current_agent.name} is thinking...")
         
         response, generation_time = current_agent.respond(self.conversation_history)
         
-        msg = {
-            "turn": turn,
-            "agent": current_agent.name,
-            "company": current_agent.company,
-            "role": current_agent.role,
-            "message": response,
-            "timestamp": datetime.now().isoformat(),
-            "generation_time": generation_time
-        }
+        return self._record_turn(current_agent, turn, response, generation_time)
         
-        self.conversation_history.append(msg)
-        logger.info(f"Turn {turn}: {current_agent.name} completed ({generation_time:.2f}s)")
+    async def _aexecute_round(
+        self,
+        round_agents: List,
+        first_turn: int,
+        deltas: Optional[asyncio.Queue] = None
+    ) -> List[Tuple[str, float]]:
+        """Generate responses for several agents concurrently from the same context.
         
-        return msg
+        Every agent builds its prompt before any response is recorded, so all
+        of them see the history as it stood at the start of the round.
+        
+        Args:
+            round_agents: Agents speaking this round, in turn order
+            first_turn: Turn number of the first agent
+            deltas: If given, responses are streamed and partial-text dicts
+                are put on this queue as they are generated
+            
+        Returns:
+            (response message, generation time) tuples, in turn order
+            
+        Raises:
+            Exception: If any agent response fails
+        """
+        for i, agent in enumerate(round_agents):
+            logger.info(f"Turn {first_turn + i}: {agent.name} is thinking...")
+        
+        if deltas is None:
+            return await asyncio.gather(*(agent.arespond(self.conversation_history) for agent in round_agents))
+        return await asyncio.gather(*(
+            self._astream_turn(agent, first_turn + i, deltas) for i, agent in enumerate(round_agents)
+        ))
+    
+    async def _astream_turn(self, current_agent, turn: int, deltas: asyncio.Queue) -> Tuple[str, float]:
+        """Stream one agent's response, putting batched partial text on a queue.
+        
+        Deltas are batched so at most one event goes out per STREAM_FLUSH_SECONDS.
+        
+        Args:
+            current_agent: Agent to generate response
+            turn: Turn number being generated
+            deltas: Queue receiving dicts with 'turn', 'agent', 'company' and 'delta' keys
+            
+        Returns:
+            (response message, generation time)
+            
+        Raises:
+            RuntimeError: If agent response fails or is empty
+        """
+        start = time.perf_counter()
+        parts = []
+        pending = []
+        last_flush = start
+        
+        async for delta in current_agent.arespond_stream(self.conversation_history):
+            parts.append(delta)
+            pending.append(delta)
+            now = time.perf_counter()
+            if now - last_flush >= self.STREAM_FLUSH_SECONDS:
+                deltas.put_nowait({"turn": turn, "agent": current_agent.name, "company": current_agent.company, "delta": "".join(pending)})
+                pending.clear()
+                last_flush = now
+        
+        if pending:
+            deltas.put_nowait({"turn": turn, "agent": current_agent.name, "company": current_agent.company, "delta": "".join(pending)})
+        
+        response = "".join(parts).strip()
+        if not response:
+            raise RuntimeError(f"Agent {current_agent.name} received empty response from LLM")
+        
+        return response, time.perf_counter() - start
+    
+    @staticmethod
+    async def _drain_deltas(pending: asyncio.Future, deltas: asyncio.Queue) -> AsyncGenerator[Dict, None]:
+        """Yield queued partial-text dicts until a round finishes, then any left over.
+        
+        Args:
+            pending: The running round
+            deltas: Queue the round's agents put partial text on
+            
+        Yields:
+            Partial-text dicts, in the order they were generated
+        """
+        while not pending.done():
+            getter = asyncio.ensure_future(deltas.get())
+            try:
+                await asyncio.wait((getter, pending), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                # A cancelled get leaves its item on the queue for the loop below
+                if not getter.done():
+                    getter.cancel()
+            if getter.done() and not getter.cancelled():
+                yield getter.result()
+        
+        while not deltas.empty():
+            yield deltas.get_nowait()
+        
+    def _execute_turn_stream(self, current_agent, turn: int) -> Generator[Dict, None, Turn]:
+        """Execute a single turn, yielding partial text as it is generated.
+        
+        Deltas are batched so at most one event goes out per STREAM_FLUSH_SECONDS.
+        
+        Args:
+            current_agent: Agent to generate response
+            turn: Current turn number
+            
+        Yields:
+            Delta dicts with 'turn', 'agent', 'company' and 'delta' keys
+            
+        Returns:
+            Recorded turn
+            
+        Raises:
+            RuntimeError: If agent response fails or is empty
+        """
+        logger.info(f"Turn {turn}: {current_agent.name} is thinking...")
+        
+        start = time.perf_counter()
+        parts = []
+        pending = []
+        last_flush = start
+        
+        for delta in current_agent.respond_stream(self.conversation_history):
+            parts.append(delta)
+            pending.append(delta)
+            now = time.perf_counter()
+            if now - last_flush >= self.STREAM_FLUSH_SECONDS:
+                yield {"turn": turn, "agent": current_agent.name, "company": current_agent.company, "delta": "".join(pending)}
+                pending.clear()
+                last_flush = now
+        
+        if pending:
+            yield {"turn": turn, "agent": current_agent.name, "company": current_agent.company, "delta": "".join(pending)}
+        
+        response = "".join(parts).strip()
+        if not response:
+            raise RuntimeError(f"Agent {current_agent.name} received empty response from LLM")
+        
+        generation_time = time.perf_counter() - start
+        
+        return self._record_turn(current_agent, turn, response, generation_time)
         
     def _should_terminate(self) -> bool:
         """
@@ -104,16 +319,9 @@ class MultiAgentOrchestrator:
         if not self.conversation_history:
             return False
         
-        last_message = self.conversation_history[-1]['message'].lower()
-        
-        # Check for completion keywords
-        completion_keywords = [
-            "deal", "agreed", "agreement", "signed", "approved",
-            "contract", "goodbye", "thank you for your time"
-        ]
-        
-        if any(keyword in last_message for keyword in completion_keywords):
-            logger.info(f"Detected completion keyword in: {last_message[:50]}...")
+        match = _COMPLETION_RE.search(self.conversation_history[-1].message)
+        if match:
+            logger.info(f"Detected completion keyword: {match.group(0)!r}")
             return True
         
         return False
@@ -134,19 +342,11 @@ class MultiAgentOrchestrator:
         self._add_initial_message(initial_message)
         
         # Round-robin conversation
-        current_agent_index = 1 if initial_message else 0
+        speakers = islice(cycle(self._llm_agents), self._start_offset(initial_message), None)
         
-        for turn in range(1, self.max_turns + 1):
-            current_agent = self.agents[current_agent_index]
-            
+        for turn, current_agent in zip(range(1, self.max_turns + 1), speakers):
             try:
-                msg = self._execute_turn(current_agent, turn)
-                
-                # Skip if human agent
-                if msg is None:
-                    current_agent_index = (current_agent_index + 1) % len(self.agents)
-                    continue
-                
+                self._execute_turn(current_agent, turn)
             except Exception as e:
                 logger.error(f"Turn {turn} failed: {e}")
                 raise
@@ -155,44 +355,83 @@ class MultiAgentOrchestrator:
             if self._should_terminate():
                 logger.info("Conversation terminated early")
                 break
-            
-            # Next agent
-            current_agent_index = (current_agent_index + 1) % len(self.agents)
         
         logger.info(f"Conversation complete: {len(self.conversation_history)} messages")
-        return self.conversation_history
+        return [msg.to_dict() for msg in self.conversation_history]
+    
+    def run_many(self, initial_messages: List[str], max_workers: int = 16) -> List[List[Dict]]:
+        """
+        Run several independent conversations with this setup in parallel threads.
+        
+        Each conversation gets its own orchestrator and fresh agent copies, so
+        no history or message cache is shared. Blocking HTTP calls release the
+        GIL, letting turns from different conversations overlap; keep
+        max_workers at or below the agent session pool size.
+        
+        Args:
+            initial_messages: One starting message per conversation
+            max_workers: Maximum conversations running at once
+            
+        Returns:
+            Message histories, in the same order as initial_messages
+        """
+        def _run_one(initial_message: str) -> List[Dict]:
+            agents = [replace(agent) for agent in self.agents]
+            return MultiAgentOrchestrator(agents, self.max_turns).run(initial_message)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_run_one, initial_messages))
+    
+    @staticmethod
+    async def arun_batch(requests: List[Tuple]) -> List[Tuple[str, float]]:
+        """
+        Generate several independent agent responses concurrently.
+        
+        Use for fan-out where responses don't depend on each other (parallel
+        reactions to the same state, or turns from separate conversations).
+        
+        Args:
+            requests: (agent, conversation_history) pairs
+            
+        Returns:
+            (response message, generation time) tuples, in request order
+        """
+        return await asyncio.gather(*(agent.arespond(history) for agent, history in requests))
     
-    def run_streaming(self, initial_message: Optional[str] = None) -> Generator[Dict, None, None]:
+    def run_streaming(
+        self,
+        initial_message: Optional[str] = None,
+        stream_tokens: bool = False
+    ) -> Generator[Dict, None, None]:
         """
         Generator that yields messages as they're created for real-time UI updates.
         
         Args:
             initial_message: Optional starting message
+            stream_tokens: Also yield partial-text dicts (with a 'delta' key)
+                while each agent is generating
             
         Yields:
-            Message dicts as they are generated
+            Message dicts as they are generated, preceded by delta dicts
+            when stream_tokens is set
         """
         logger.info(f"Starting streaming conversation with {len(self.agents)} agents")
         
         # Add and yield initial message if provided
         if self._add_initial_message(initial_message):
-            yield self.conversation_history[0]
+            yield self.conversation_history[0].to_dict()
         
         # Round-robin conversation
-        current_agent_index = 1 if initial_message else 0
+        speakers = islice(cycle(self._llm_agents), self._start_offset(initial_message), None)
         
-        for turn in range(1, self.max_turns + 1):
-            current_agent = self.agents[current_agent_index]
-            
+        for turn, current_agent in zip(range(1, self.max_turns + 1), speakers):
             try:
-                msg = self._execute_turn(current_agent, turn)
+                if stream_tokens:
+                    msg = yield from self._execute_turn_stream(current_agent, turn)
+                else:
+                    msg = self._execute_turn(current_agent, turn)
                 
-                # Skip if human agent
-                if msg is None:
-                    current_agent_index = (current_agent_index + 1) % len(self.agents)
-                    continue
-                
-                yield msg
+                yield msg.to_dict()
                 
             except Exception as e:
                 logger.error(f"Turn {turn} failed: {e}")
@@ -202,8 +441,83 @@ class MultiAgentOrchestrator:
             if self._should_terminate():
                 logger.info("Conversation terminated early")
                 break
+        
+        logger.info(f"Conversation complete: {len(self.conversation_history)} messages")
+    
+    async def arun_streaming(
+        self,
+        initial_message: Optional[str] = None,
+        stream_tokens: bool = False
+    ) -> AsyncGenerator[Dict, None]:
+        """
+        Async variant of `run_streaming` for event-loop servers.
+        
+        Each turn awaits the LLM call, so one worker can drive many
+        conversations at once instead of holding a thread per conversation.
+        With parallel_within_round, each round's agents respond concurrently.
+        The next round is started before the current turn is yielded, since
+        it only depends on the recorded history, not on the consumer.
+        
+        Args:
+            initial_message: Optional starting message
+            stream_tokens: Also yield partial-text dicts (with a 'delta' key)
+                while agents are generating; with parallel_within_round,
+                deltas for a round's turns may interleave
             
-            # Next agent
-            current_agent_index = (current_agent_index + 1) % len(self.agents)
+        Yields:
+            Message dicts as they are generated, preceded by delta dicts
+            when stream_tokens is set
+        """
+        logger.info(f"Starting async conversation with {len(self.agents)} agents")
+        
+        # Add and yield initial message if provided
+        if self._add_initial_message(initial_message):
+            yield self.conversation_history[0].to_dict()
+        
+        # Round-robin conversation, one agent or one full round per step
+        speakers = islice(cycle(self._llm_agents), self._start_offset(initial_message), None)
+        step = len(self._llm_agents) if self.parallel_within_round else 1
+        deltas = asyncio.Queue() if stream_tokens else None
+        
+        def schedule(first_turn: int) -> Tuple[List, asyncio.Task]:
+            round_agents = list(islice(speakers, max(0, min(step, self.max_turns + 1 - first_turn))))
+            return round_agents, asyncio.ensure_future(self._aexecute_round(round_agents, first_turn, deltas))
+        
+        turn = 1
+        round_agents, pending = schedule(turn)
+        try:
+            while pending is not None:
+                try:
+                    if deltas is not None:
+                        async for delta in self._drain_deltas(pending, deltas):
+                            yield delta
+                    responses = await pending
+                except Exception as e:
+                    logger.error(f"Turn {turn} failed: {e}")
+                    raise
+                
+                pending = None
+                next_agents = None
+                for i, (agent, (response, generation_time)) in enumerate(zip(round_agents, responses)):
+                    msg = self._record_turn(agent, turn, response, generation_time)
+                    turn += 1
+                    terminated = self._should_terminate()
+                    
+                    # Start the next round before yielding, so its LLM call
+                    # overlaps the caller sending this turn to the client
+                    if not terminated and i == len(round_agents) - 1 and turn <= self.max_turns:
+                        next_agents, pending = schedule(turn)
+                    
+                    yield msg.to_dict()
+                    
+                    if terminated:
+                        logger.info("Conversation terminated early")
+                        break
+                
+                round_agents = next_agents
+        finally:
+            # Client went away mid-stream: don't leave the next call running
+            if pending is not None:
+                pending.cancel()
         
         logger.info(f"Conversation complete: {len(self.conversation_history)} messages")
@@ -2,13 +2,51 @@
 Helper functions for The Grid API.
 """
 
+from dataclasses import dataclass
+from typing import Dict, Optional
+
 from agents import Agent
 from utils.config import DEFAULT_MODEL
 
 
+@dataclass(frozen=True, slots=True)
+class AgentTemplate:
+    """Predefined library agent; company None means the client company."""
+    name: str
+    company: Optional[str]
+    role: str
+    objective: str
+    
+    def build(self, client: str) -> Agent:
+        """Create a fresh Agent from this template.
+        
+        Args:
+            client: Client company name
+            
+        Returns:
+            Configured Agent instance
+        """
+        return Agent(self.name, self.company or client, self.role, self.objective, DEFAULT_MODEL)
+
+
+_AGENT_TEMPLATES: tuple[AgentTemplate, ...] = (
+    AgentTemplate("Sarah", "HPE", "Sales Engineer", "Sell servers and close the deal"),
+    AgentTemplate("Yuki", None, "IT Procurement Manager", "Get the best price and terms"),
+    AgentTemplate("Marcus", None, "Technical Lead", "Ensure technical requirements are met"),
+    AgentTemplate("Lisa", "HPE", "Account Manager", "Build relationship and ensure customer satisfaction"),
+    AgentTemplate("Ken", None, "CFO", "Minimize costs and maximize ROI")
+)
+
+# Library agents by name, for scenarios that pick agents explicitly
+AGENT_LIBRARY: Dict[str, AgentTemplate] = {t.name: t for t in _AGENT_TEMPLATES}
+
+
 def create_agent(index: int, client: str) -> Agent:
     """Factory function to create agents based on index.
     
+    Agents carry per-conversation state (message cache, length history), so a
+    fresh instance is returned every call; only the templates are shared.
+    
     Args:
         index: Agent index (0-4)
         client: Client company name
@@ -16,12 +54,4 @@ def create_agent(index: int, client: str) -> Agent:
     Returns:
         Configured Agent instance
     """
-    agent_configs = [
-        ("Sarah", "HPE", "Sales Engineer", "Sell servers and close the deal"),
-        ("Yuki", client, "IT Procurement Manager", "Get the best price and terms"),
-        ("Marcus", client, "Technical Lead", "Ensure technical requirements are met"),
-        ("Lisa", "HPE", "Account Manager", "Build relationship and ensure customer satisfaction"),
-        ("Ken", client, "CFO", "Minimize costs and maximize ROI")
-    ]
-    name, company, role, objective = agent_configs[index]
-    return Agent(name, company, role, objective, DEFAULT_MODEL)
+    return _AGENT_TEMPLATES[index].build(client)
@@ -5,26 +5,39 @@ Simple REST API to decouple frontend from agent logic.
 """
 
 import logging
-import json
 import uuid
-from typing import Dict
+from contextlib import asynccontextmanager
 from datetime import datetime
 
+import orjson
+
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from agents import MultiAgentOrchestrator, Agent
+from agents.base import ENDPOINT_POOL, aclose_async_client, llm_client
+from agents.cache import DiskResponseCache, ResponseCache, cache_key
 from api.models import ConversationRequest, ConversationResponse, AssistantChatRequest, ScenarioStartRequest
-from api.helpers import create_agent
+from api.helpers import AGENT_LIBRARY, create_agent
+from api.store import create_store
 from utils.logging_config import setup_logging
-from utils.config import LLM_API_ENDPOINT, LLM_API_TOKEN, DEFAULT_MODEL
+from utils.config import DEFAULT_MODEL, REDIS_URL, LLM_CACHE_DIR
 
 # Configure logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="The Grid API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the agents' shared LLM client and the conversation store on shutdown."""
+    yield
+    await aclose_async_client()
+    await conversations.close()
+
+
+app = FastAPI(title="The Grid API", version="0.1.0", lifespan=lifespan)
 
 # CORS for frontend
 app.add_middleware(
@@ -34,8 +47,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory conversation storage (POC - resets on restart)
-conversations: Dict[str, dict] = {}
+# Conversation storage: in-memory (single worker) unless REDIS_URL is set
+conversations = create_store(REDIS_URL)
 
 
 # ============================================================================
@@ -52,6 +65,13 @@ def root():
 # ASSISTANT ENDPOINTS (Conversational Agent Selection)
 # ============================================================================
 
+# Replies keyed on the exact request, so replaying a configuration chat
+# (demos, retries) skips the LLM round trip; on disk when LLM_CACHE_DIR is set
+_ASSISTANT_CACHE = (
+    DiskResponseCache(LLM_CACHE_DIR, ttl=3600) if LLM_CACHE_DIR
+    else ResponseCache(maxsize=256, ttl=3600)
+)
+
 @app.post("/assistant/chat")
 def assistant_chat(req: AssistantChatRequest):
     """Chat with Grid assistant to select agents and configure scenario.
@@ -62,8 +82,6 @@ def assistant_chat(req: AssistantChatRequest):
     Returns:
         StreamingResponse with assistant's response
     """
-    import requests
-    
     def event_stream():
         """Stream assistant responses."""
         try:
@@ -133,39 +151,41 @@ Example: {"name": "Pinote", "company": "Toyota", "role": "Supply Chain Manager",
                 "content": req.message
             })
             
-            # Call LLM API
-            response = requests.post(
-                LLM_API_ENDPOINT,
-                headers={
-                    "Authorization": f"Bearer {LLM_API_TOKEN}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": DEFAULT_MODEL,
-                    "messages": messages,
-                    "max_tokens": 300,
-                    "temperature": 0.7
-                },
-                timeout=60,
-                verify=False
-            )
-            response.raise_for_status()
+            payload = {
+                "model": DEFAULT_MODEL,
+                "messages": messages,
+                "max_tokens": 300,
+                "temperature": 0.7
+            }
+            key = cache_key(payload)
+            assistant_message = _ASSISTANT_CACHE.get(key)
             
-            # Parse and stream response
-            result = response.json()
-            assistant_message = result['choices'][0]['message']['content'].strip()
+            if assistant_message is None:
+                # Call LLM API over the agents' pooled client and endpoint pool
+                with ENDPOINT_POOL.acquire() as endpoint:
+                    response = llm_client().post(
+                        endpoint.url,
+                        content=orjson.dumps(payload),
+                        headers=endpoint.headers
+                    )
+                response.raise_for_status()
+                
+                # Parse and cache response
+                result = orjson.loads(response.content)
+                assistant_message = result['choices'][0]['message']['content'].strip()
+                _ASSISTANT_CACHE.set(key, assistant_message)
             
-            yield f"data: {json.dumps({'message': assistant_message})}\n\n"
+            yield b"data: " + orjson.dumps({'message': assistant_message}) + b"\n\n"
             
         except Exception as e:
             logger.error(f"Assistant chat failed: {e}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield b"data: " + orjson.dumps({'error': str(e)}) + b"\n\n"
     
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @app.post("/scenarios/start")
-def start_scenario(req: ScenarioStartRequest):
+async def start_scenario(req: ScenarioStartRequest):
     """Start a scenario with selected agents.
     
     Args:
@@ -174,27 +194,15 @@ def start_scenario(req: ScenarioStartRequest):
     Returns:
         StreamingResponse with scenario messages
     """
-    # Agent name to config mapping (predefined library)
-    agent_library = {
-        "Sarah": ("Sarah", "HPE", "Sales Engineer", "Sell servers and close the deal"),
-        "Yuki": ("Yuki", req.client, "IT Procurement Manager", "Get the best price and terms"),
-        "Marcus": ("Marcus", req.client, "Technical Lead", "Ensure technical requirements are met"),
-        "Lisa": ("Lisa", "HPE", "Account Manager", "Build relationship and ensure customer satisfaction"),
-        "Ken": ("Ken", req.client, "CFO", "Minimize costs and maximize ROI")
-    }
-    
     # Create agents from names or custom definitions
     agents = []
     for agent_def in req.agents:
         if isinstance(agent_def, str):
             # Library agent by name
-            if agent_def not in agent_library:
+            if agent_def not in AGENT_LIBRARY:
                 raise HTTPException(status_code=400, detail=f"Unknown agent: {agent_def}. Use a library agent (Sarah, Yuki, Marcus, Lisa, Ken) or provide custom agent definition.")
             
-            name, company, role, objective = agent_library[agent_def]
-            # Replace client placeholder
-            company = company if company == "HPE" else req.client
-            agents.append(Agent(name, company, role, objective, DEFAULT_MODEL))
+            agents.append(AGENT_LIBRARY[agent_def].build(req.client))
         
         elif isinstance(agent_def, dict):
             # Custom agent definition
@@ -219,17 +227,17 @@ def start_scenario(req: ScenarioStartRequest):
     # Create orchestrator
     orchestrator = MultiAgentOrchestrator(agents, max_turns=req.max_turns)
     
-    def event_stream():
-        """Stream scenario messages."""
+    async def event_stream():
+        """Stream scenario messages, preceded by partial-text deltas if requested."""
         try:
-            for msg in orchestrator.run_streaming(f"Let's discuss: {req.scenario}"):
-                yield f"data: {json.dumps(msg)}\n\n"
+            async for msg in orchestrator.arun_streaming(f"Let's discuss: {req.scenario}", stream_tokens=req.stream_tokens):
+                yield b"data: " + orjson.dumps(msg) + b"\n\n"
             
             logger.info(f"Scenario completed with {len(agents)} agents")
             
         except Exception as e:
             logger.error(f"Scenario failed: {e}")
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield b"data: " + orjson.dumps({'error': str(e)}) + b"\n\n"
     
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
@@ -239,7 +247,7 @@ def start_scenario(req: ScenarioStartRequest):
 # ============================================================================
 
 @app.post("/conversations", response_model=ConversationResponse)
-def create_conversation(req: ConversationRequest):
+async def create_conversation(req: ConversationRequest):
     """Create a new conversation and return its ID.
     
     Args:
@@ -250,22 +258,21 @@ def create_conversation(req: ConversationRequest):
     """
     conv_id = str(uuid.uuid4())
     
-    conversations[conv_id] = {
+    await conversations.create(conv_id, {
         "scenario": req.scenario,
         "client": req.client,
         "num_agents": req.num_agents,
         "max_turns": req.max_turns,
         "status": "created",
-        "messages": [],
         "created_at": datetime.now().isoformat()
-    }
+    })
     
     logger.info(f"Created conversation {conv_id}: {req.scenario}")
     return ConversationResponse(conversation_id=conv_id)
 
 
 @app.get("/conversations/{conv_id}")
-def get_conversation(conv_id: str):
+async def get_conversation(conv_id: str):
     """Get conversation details and history.
     
     Args:
@@ -277,7 +284,7 @@ def get_conversation(conv_id: str):
     Raises:
         HTTPException: If conversation not found
     """
-    conv = conversations.get(conv_id)
+    conv = await conversations.get(conv_id)
     if not conv:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
@@ -285,7 +292,7 @@ def get_conversation(conv_id: str):
 
 
 @app.post("/conversations/{conv_id}/start")
-def start_conversation(conv_id: str):
+async def start_conversation(conv_id: str):
     """Start conversation and stream messages via SSE.
     
     Args:
@@ -297,43 +304,44 @@ def start_conversation(conv_id: str):
     Raises:
         HTTPException: If conversation not found
     """
-    conv = conversations.get(conv_id)
+    conv = await conversations.get(conv_id)
     if not conv:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
     # Update status
-    conv["status"] = "running"
+    await conversations.update(conv_id, status="running")
     logger.info(f"Starting conversation {conv_id}")
     
     # Create agents
     agents = [create_agent(i, conv["client"]) for i in range(conv["num_agents"])]
     orchestrator = MultiAgentOrchestrator(agents, max_turns=conv["max_turns"])
     
-    def event_stream():
+    async def event_stream():
         """Generator for SSE events."""
+        count = 0
         try:
-            for msg in orchestrator.run_streaming(f"Let's discuss: {conv['scenario']}"):
+            async for msg in orchestrator.arun_streaming(f"Let's discuss: {conv['scenario']}"):
                 # Store message
-                conv["messages"].append(msg)
+                await conversations.append_message(conv_id, msg)
+                count += 1
                 
                 # Send as SSE
-                yield f"data: {json.dumps(msg)}\n\n"
+                yield b"data: " + orjson.dumps(msg) + b"\n\n"
             
             # Mark complete
-            conv["status"] = "completed"
-            logger.info(f"Conversation {conv_id} completed with {len(conv['messages'])} messages")
+            await conversations.update(conv_id, status="completed")
+            logger.info(f"Conversation {conv_id} completed with {count} messages")
             
         except Exception as e:
             logger.error(f"Conversation {conv_id} failed: {e}")
-            conv["status"] = "failed"
-            conv["error"] = str(e)
-            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            await conversations.update(conv_id, status="failed", error=str(e))
+            yield b"data: " + orjson.dumps({'error': str(e)}) + b"\n\n"
     
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @app.delete("/conversations/{conv_id}")
-def delete_conversation(conv_id: str):
+async def delete_conversation(conv_id: str):
     """Delete a conversation.
     
     Args:
@@ -345,10 +353,9 @@ def delete_conversation(conv_id: str):
     Raises:
         HTTPException: If conversation not found
     """
-    if conv_id not in conversations:
+    if not await conversations.delete(conv_id):
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    del conversations[conv_id]
     logger.info(f"Deleted conversation {conv_id}")
     
     return {"status": "deleted", "conversation_id": conv_id}
@@ -39,3 +39,4 @@ class ScenarioStartRequest(BaseModel):
     client: str
     agents: List[Union[str, Dict[str, str]]]  # Agent names from library OR custom agent definitions
     max_turns: int = 5
+    stream_tokens: bool = False  # Also send partial-text 'delta' events while agents generate
@@ -0,0 +1,184 @@
+"""
+Conversation storage for The Grid API.
+
+In-memory by default (bounded, with TTL); set REDIS_URL to share conversations
+across uvicorn workers and API replicas.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Conversations expire after a day of inactivity
+CONVERSATION_TTL_SECONDS = 24 * 3600
+
+# Redis writes to an existing conversation: check and write in one atomic
+# step, so a write racing a delete can't recreate the conversation's keys.
+# KEYS = (fields hash, messages list); ARGV[1] = TTL seconds
+_UPDATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+_APPEND_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+redis.call('RPUSH', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+class MemoryConversationStore:
+    """
+    Process-local store, bounded by count and idle time.
+    
+    Only valid for a single worker - use RedisConversationStore to scale out.
+    """
+    
+    def __init__(self, maxsize: int = 1000, ttl: float = CONVERSATION_TTL_SECONDS) -> None:
+        """Initialize the store.
+        
+        Args:
+            maxsize: Maximum conversations kept before evicting the least recently used
+            ttl: Seconds a conversation is kept after its last write
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._conversations: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+    
+    def _live(self, conv_id: str) -> Optional[dict]:
+        """Return a conversation if present and not expired."""
+        entry = self._conversations.get(conv_id)
+        if entry is None:
+            return None
+        expires_at, conv = entry
+        if expires_at < time.monotonic():
+            del self._conversations[conv_id]
+            return None
+        return conv
+    
+    def _touch(self, conv_id: str, conv: dict) -> None:
+        """Refresh a conversation's TTL and LRU position, evicting over maxsize."""
+        self._conversations[conv_id] = (time.monotonic() + self.ttl, conv)
+        self._conversations.move_to_end(conv_id)
+        while len(self._conversations) > self.maxsize:
+            evicted, _ = self._conversations.popitem(last=False)
+            logger.info(f"Evicted conversation {evicted}")
+    
+    async def create(self, conv_id: str, data: Dict) -> None:
+        """Store a new conversation (messages start empty)."""
+        self._touch(conv_id, {**data, "messages": []})
+    
+    async def get(self, conv_id: str) -> Optional[Dict]:
+        """Return conversation data including messages, or None if not found."""
+        return self._live(conv_id)
+    
+    async def update(self, conv_id: str, **fields) -> None:
+        """Set top-level fields (e.g. status) on an existing conversation."""
+        conv = self._live(conv_id)
+        if conv is not None:
+            conv.update(fields)
+            self._touch(conv_id, conv)
+    
+    async def append_message(self, conv_id: str, msg: Dict) -> None:
+        """Append a message to an existing conversation."""
+        conv = self._live(conv_id)
+        if conv is not None:
+            conv["messages"].append(msg)
+            self._touch(conv_id, conv)
+    
+    async def delete(self, conv_id: str) -> bool:
+        """Delete a conversation. Returns False if it did not exist."""
+        return self._conversations.pop(conv_id, None) is not None
+    
+    async def close(self) -> None:
+        """Nothing to release for the in-memory store."""
+
+
+class RedisConversationStore:
+    """
+    Redis-backed store shared by every API worker.
+    
+    Fields live in a hash at conv:{id} and messages in a list at
+    conv:{id}:msgs; values are JSON-encoded and both keys share one TTL.
+    """
+    
+    def __init__(self, url: str, ttl: int = CONVERSATION_TTL_SECONDS) -> None:
+        """Initialize the store.
+        
+        Args:
+            url: Redis connection URL
+            ttl: Seconds a conversation is kept after its last write
+        """
+        import redis.asyncio as redis
+        
+        self.redis = redis.from_url(url)
+        self.ttl = ttl
+        self._update = self.redis.register_script(_UPDATE_SCRIPT)
+        self._append = self.redis.register_script(_APPEND_SCRIPT)
+    
+    async def _expire(self, conv_id: str) -> None:
+        """Refresh the TTL on both of a conversation's keys."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.expire(f"conv:{conv_id}", self.ttl)
+            pipe.expire(f"conv:{conv_id}:msgs", self.ttl)
+            await pipe.execute()
+    
+    async def create(self, conv_id: str, data: Dict) -> None:
+        """Store a new conversation (messages start empty)."""
+        await self.redis.hset(f"conv:{conv_id}", mapping={k: orjson.dumps(v) for k, v in data.items()})
+        await self._expire(conv_id)
+    
+    async def get(self, conv_id: str) -> Optional[Dict]:
+        """Return conversation data including messages, or None if not found."""
+        fields, messages = await asyncio.gather(
+            self.redis.hgetall(f"conv:{conv_id}"),
+            self.redis.lrange(f"conv:{conv_id}:msgs", 0, -1)
+        )
+        if not fields:
+            return None
+        conv = {k.decode(): orjson.loads(v) for k, v in fields.items()}
+        conv["messages"] = [orjson.loads(m) for m in messages]
+        return conv
+    
+    async def update(self, conv_id: str, **fields) -> None:
+        """Set top-level fields (e.g. status) on an existing conversation."""
+        if fields:
+            args = [item for k, v in fields.items() for item in (k, orjson.dumps(v))]
+            await self._update(keys=[f"conv:{conv_id}", f"conv:{conv_id}:msgs"], args=[self.ttl, *args])
+    
+    async def append_message(self, conv_id: str, msg: Dict) -> None:
+        """Append a message to an existing conversation."""
+        await self._append(keys=[f"conv:{conv_id}", f"conv:{conv_id}:msgs"], args=[self.ttl, orjson.dumps(msg)])
+    
+    async def delete(self, conv_id: str) -> bool:
+        """Delete a conversation. Returns False if it did not exist."""
+        return await self.redis.delete(f"conv:{conv_id}", f"conv:{conv_id}:msgs") > 0
+    
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        await self.redis.aclose()
+
+
+def create_store(redis_url: str = ""):
+    """Pick the conversation store for this deployment.
+    
+    Args:
+        redis_url: Redis connection URL; empty for the in-memory store
+    
+    Returns:
+        RedisConversationStore if a URL is given, else MemoryConversationStore
+    """
+    if redis_url:
+        logger.info("Using Redis conversation store")
+        return RedisConversationStore(redis_url)
+    return MemoryConversationStore()
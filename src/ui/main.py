@@ -1,10 +1,17 @@
 import streamlit as st
-import requests
-import json
+import httpx
+import orjson
 import logging
-import os
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List
 
-from utils.logging_config import setup_logging
+from utils.config import API_URL, CONVERSATIONS_DIR
+from utils.logging_config import log_if, setup_logging
 
 # Configure logging
 setup_logging()
@@ -18,23 +25,89 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# API Configuration
-API_URL = os.getenv("API_URL", "http://api:8000")
+# Scenario transcripts are appended to CONVERSATIONS_DIR as JSONL; session state
+# keeps only the latest RECENT_MESSAGES and older ones are read back on request
+RECENT_MESSAGES = 50
+
+# Minimum interval between redraws of a message that is still being generated
+DRAFT_FLUSH_SECONDS = 0.1
+
+# Chat bubble (role, avatar) per company; any client company falls back to the user side
+COMPANY_STYLE = {"HPE": ("assistant", "🏢")}
+CLIENT_STYLE = ("user", "👤")
 
 # Initialize session state
-if 'assistant_history' not in st.session_state:
-    st.session_state.assistant_history = []
-if 'scenario_config' not in st.session_state:
-    st.session_state.scenario_config = None
-if 'scenario_messages' not in st.session_state:
-    st.session_state.scenario_messages = []
-if 'scenario_running' not in st.session_state:
-    st.session_state.scenario_running = False
+for key, default in {
+    "assistant_history": [],
+    "scenario_config": None,
+    "scenario_messages": deque(maxlen=RECENT_MESSAGES),
+    "scenario_count": 0,
+    "scenario_path": None,
+    "scenario_running": False
+}.items():
+    st.session_state.setdefault(key, default)
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+@st.cache_resource
+def get_client() -> httpx.Client:
+    """Return the process-wide HTTP client, so API calls reuse pooled connections across reruns."""
+    return httpx.Client(
+        base_url=API_URL,
+        headers={"Content-Type": "application/json"},
+        transport=httpx.HTTPTransport(
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+            retries=2  # Reconnect if the API restarted between reruns
+        )
+    )
+
+
+@contextmanager
+def stream_api(path: str, payload: dict, timeout: float) -> Iterator[httpx.Response]:
+    """POST to the API and keep the response open for streaming.
+    
+    Raises:
+        httpx.HTTPStatusError: On an error status, with the body already read
+    """
+    with get_client().stream("POST", path, content=orjson.dumps(payload), timeout=timeout) as response:
+        if response.is_error:
+            response.read()
+        response.raise_for_status()
+        yield response
+
+
+def iter_sse(response: httpx.Response) -> Iterator[dict]:
+    """Yield the JSON payload of each `data:` event in an SSE response."""
+    for line in response.iter_lines():
+        if line.startswith('data: '):
+            yield orjson.loads(line[6:])
+
+
+def start_scenario_log() -> None:
+    """Point the session at a fresh transcript file and clear recent messages."""
+    directory = Path(CONVERSATIONS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    st.session_state.scenario_path = str(directory / f"{uuid.uuid4()}.jsonl")
+    st.session_state.scenario_messages.clear()
+    st.session_state.scenario_count = 0
+
+
+def append_scenario_message(msg: dict) -> None:
+    """Append a message to the transcript file and the recent-messages window."""
+    with open(st.session_state.scenario_path, "ab") as f:
+        f.write(orjson.dumps(msg) + b"\n")
+    st.session_state.scenario_messages.append(msg)
+    st.session_state.scenario_count += 1
+
+
+def load_scenario_messages(limit: int) -> List[dict]:
+    """Read the first `limit` messages back from the transcript file."""
+    with open(st.session_state.scenario_path, "rb") as f:
+        return [orjson.loads(line) for line in islice(f, limit)]
+
+
 def display_chat_message(role: str, content: str) -> None:
     """Display a chat message."""
     with st.chat_message(role):
@@ -43,7 +116,8 @@ def display_chat_message(role: str, content: str) -> None:
 
 def display_scenario_message(msg: dict) -> None:
     """Display a scenario message."""
-    with st.chat_message("assistant" if msg['company'] == "HPE" else "user"):
+    role, avatar = COMPANY_STYLE.get(msg['company'], CLIENT_STYLE)
+    with st.chat_message(role, avatar=avatar):
         gen_time = msg.get('generation_time')
         if gen_time:
             st.markdown(f"**{msg['agent']}** ({msg['company']}) - *{gen_time:.2f}s*")
@@ -59,7 +133,7 @@ def parse_scenario_config(message: str) -> dict:
         if "{" in message and "}" in message:
             start = message.index("{")
             end = message.rindex("}") + 1
-            config = json.loads(message[start:end])
+            config = orjson.loads(message[start:end])
             
             # Validate all required fields are present
             required_fields = ["ready", "agents", "scenario", "client", "max_turns"]
@@ -114,28 +188,19 @@ with col1:
             
             # Call assistant API
             try:
-                response = requests.post(
-                    f"{API_URL}/assistant/chat",
-                    json={
-                        "message": user_input,
-                        "history": st.session_state.assistant_history[:-1]  # Exclude current message
-                    },
-                    stream=True,
-                    timeout=60
-                )
-                response.raise_for_status()
+                payload = {
+                    "message": user_input,
+                    "history": st.session_state.assistant_history[:-1]  # Exclude current message
+                }
                 
                 # Parse SSE stream
                 assistant_message = ""
-                for line in response.iter_lines():
-                    if line:
-                        line_str = line.decode('utf-8')
-                        if line_str.startswith('data: '):
-                            data = json.loads(line_str[6:])
-                            if 'error' in data:
-                                st.error(f"Error: {data['error']}")
-                                break
-                            assistant_message = data.get('message', '')
+                with stream_api("/assistant/chat", payload, timeout=60) as response:
+                    for data in iter_sse(response):
+                        if 'error' in data:
+                            st.error(f"Error: {data['error']}")
+                            break
+                        assistant_message = data.get('message', '')
                 
                 if assistant_message:
                     # Add assistant response to history
@@ -178,7 +243,6 @@ with col1:
             
             if st.button("▶️ Start Scenario", type="primary", use_container_width=True):
                 st.session_state.scenario_running = True
-                st.session_state.scenario_messages = []
                 st.rerun()
     
     if st.session_state.scenario_running:
@@ -186,78 +250,99 @@ with col1:
             st.session_state.scenario_running = False
             st.rerun()
     
-    if st.session_state.scenario_messages and not st.session_state.scenario_running:
+    if st.session_state.scenario_count and not st.session_state.scenario_running:
         if st.button("🔄 New Scenario", use_container_width=True):
             st.session_state.assistant_history = []
             st.session_state.scenario_config = None
-            st.session_state.scenario_messages = []
+            st.session_state.scenario_messages.clear()
+            st.session_state.scenario_count = 0
+            st.session_state.scenario_path = None
             st.rerun()
 
 # ============================================================================
 # RIGHT PANEL - SCENARIO SIMULATION
 # ============================================================================
 
-with col2:
+@st.fragment
+def render_scenario_panel() -> None:
+    """Render the scenario panel.
+    
+    Runs as a fragment, so widgets inside it (e.g. the older-messages toggle)
+    rerun only this panel instead of the whole page.
+    """
     st.subheader("🎭 Scenario Simulation")
     
     if st.session_state.scenario_running:
-        message_placeholder = st.empty()
+        # Messages are appended to this container as they arrive; redrawing
+        # the whole history per event made rendering quadratic in turns
+        message_container = st.container()
         status_placeholder = st.empty()
         
+        # Partial text of messages still being generated: turn -> (placeholder, parts)
+        drafts = {}
+        last_flush = 0.0
+        
         try:
             config = st.session_state.scenario_config
+            start_scenario_log()
             
             # Debug logging
-            logger.info(f"Starting scenario with config: {config}")
+            log_if(logger, logging.INFO, lambda: f"Starting scenario with config: {config}")
             
             # Start scenario via API
             payload = {
                 "scenario": config["scenario"],
                 "client": config["client"],
                 "agents": config["agents"],
-                "max_turns": config["max_turns"]
+                "max_turns": config["max_turns"],
+                "stream_tokens": True
             }
-            logger.info(f"Sending payload: {payload}")
-            
-            response = requests.post(
-                f"{API_URL}/scenarios/start",
-                json=payload,
-                stream=True,
-                timeout=600
-            )
-            response.raise_for_status()
+            log_if(logger, logging.INFO, lambda: f"Sending payload: {payload}")
             
             # Process SSE stream
-            for line in response.iter_lines():
-                if line:
-                    line_str = line.decode('utf-8')
-                    if line_str.startswith('data: '):
-                        data = json.loads(line_str[6:])
-                        
-                        if 'error' in data:
-                            st.error(f"Error: {data['error']}")
-                            break
-                        
-                        st.session_state.scenario_messages.append(data)
-                        
-                        # Display all messages
-                        with message_placeholder.container():
-                            for msg in st.session_state.scenario_messages:
-                                display_scenario_message(msg)
-                        
-                        # Show progress
-                        with status_placeholder:
-                            st.info(f"💭 Turn {data.get('turn', '?')}/{config['max_turns']}...")
+            with stream_api("/scenarios/start", payload, timeout=600) as response:
+                for data in iter_sse(response):
+                    if 'error' in data:
+                        st.error(f"Error: {data['error']}")
+                        break
+                    
+                    if 'delta' in data:
+                        # Partial text: buffer it and redraw the draft at most every DRAFT_FLUSH_SECONDS.
+                        # Drafts are per turn, since agents in a parallel round stream together
+                        if data['turn'] not in drafts:
+                            drafts[data['turn']] = (message_container.empty(), [])
+                        draft, draft_parts = drafts[data['turn']]
+                        draft_parts.append(data['delta'])
+                        now = time.monotonic()
+                        if now - last_flush >= DRAFT_FLUSH_SECONDS:
+                            with draft.container():
+                                role, avatar = COMPANY_STYLE.get(data['company'], CLIENT_STYLE)
+                                with st.chat_message(role, avatar=avatar):
+                                    st.markdown(f"**{data['agent']}** ({data['company']})")
+                                    st.write("".join(draft_parts))
+                            last_flush = now
+                        continue
+                    
+                    append_scenario_message(data)
+                    
+                    # Display only the new message, replacing its draft if there was one
+                    draft = drafts.pop(data.get('turn'), None)
+                    with draft[0].container() if draft is not None else message_container:
+                        display_scenario_message(data)
+                    
+                    # Show progress
+                    with status_placeholder:
+                        st.info(f"💭 Turn {data.get('turn', '?')}/{config['max_turns']}...")
             
             status_placeholder.empty()
             st.session_state.scenario_running = False
-            st.success(f"✅ Scenario complete! {len(st.session_state.scenario_messages)} messages")
+            st.success(f"✅ Scenario complete! {st.session_state.scenario_count} messages")
             
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             error_detail = ""
             try:
                 error_detail = e.response.json()
-            except:
+            except ValueError:
                 error_detail = e.response.text
             st.error(f"Scenario error: {e}")
             st.error(f"Details: {error_detail}")
@@ -268,13 +353,21 @@ with col2:
             logger.error(f"Scenario failed: {e}")
             st.session_state.scenario_running = False
     
-    elif st.session_state.scenario_messages:
-        # Display saved scenario
+    elif st.session_state.scenario_count:
+        # Display saved scenario; older messages are only read from disk on request
+        hidden = st.session_state.scenario_count - len(st.session_state.scenario_messages)
+        if hidden > 0 and st.toggle(f"Show {hidden} older messages"):
+            for msg in load_scenario_messages(hidden):
+                display_scenario_message(msg)
         for msg in st.session_state.scenario_messages:
             display_scenario_message(msg)
     else:
         st.info("👈 Chat with Grid to configure a scenario, then click Start")
 
+
+with col2:
+    render_scenario_panel()
+
 # Footer
 st.divider()
 st.caption("The Grid v0.1 | Powered by External LLM API")
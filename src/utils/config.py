@@ -2,19 +2,108 @@
 Shared configuration for The Grid.
 
 Centralized environment variable access to avoid duplication across modules.
+Everything is read and parsed once, at import, into a frozen Config.
 """
 
+import logging
 import os
+from dataclasses import dataclass, field
+from typing import Final
+from urllib.parse import urlsplit
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Settings resolved from the environment."""
+    api_url: str
+    weaviate_url: str
+    redis_url: str
+    llm_cache_dir: str
+    llm_api_endpoint: str
+    llm_api_token: str = field(repr=False)  # Keep secrets out of logs
+    llm_endpoints: tuple[tuple[str, str], ...] = field(repr=False)
+    default_model: str
+    max_turns: int
+    conversations_dir: str
+    log_level: str  # Level name, e.g. "INFO"
+    
+    def __post_init__(self) -> None:
+        # Fail at import on a bad setting instead of on the first request
+        if self.max_turns < 1:
+            raise RuntimeError(f"MAX_TURNS must be at least 1, got {self.max_turns}")
+        urls = [("API_URL", self.api_url), ("WEAVIATE_URL", self.weaviate_url)]
+        urls += [("LLM endpoint URL", url) for url, _ in self.llm_endpoints]
+        for name, url in urls:
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https") or not parts.netloc:
+                raise RuntimeError(f"Invalid {name}: {url!r}")
+        if self.log_level not in logging.getLevelNamesMapping():
+            raise RuntimeError(f"Unknown LOG_LEVEL: {self.log_level!r}")
+
+
+def _env(key: str, default: str) -> str:
+    """Read an environment variable, treating empty as unset.
+    
+    docker-compose passes unset host variables through as "", which would
+    otherwise override the default.
+    """
+    return os.environ.get(key) or default
+
+
+def _load() -> Config:
+    """Read and parse all settings from the environment."""
+    llm_api_endpoint = _env("LLM_API_ENDPOINT", "http://host.docker.internal:7000/v1/chat/completions")
+    llm_api_token = _env("LLM_API_TOKEN", "")
+    
+    # Optional pool of endpoints as "url|token,url|token" (token may be omitted);
+    # falls back to the single endpoint above
+    llm_endpoints = tuple(
+        (url.strip(), token.strip())
+        for url, _, token in (
+            entry.partition("|") for entry in _env("LLM_ENDPOINTS", "").split(",") if entry.strip()
+        )
+    ) or ((llm_api_endpoint, llm_api_token),)
+    
+    raw_max_turns = _env("MAX_TURNS", "30")
+    try:
+        max_turns = int(raw_max_turns)
+    except ValueError:
+        raise RuntimeError(f"MAX_TURNS must be an integer, got {raw_max_turns!r}") from None
+    
+    return Config(
+        api_url=_env("API_URL", "http://api:8000"),
+        weaviate_url=_env("WEAVIATE_URL", "http://weaviate:8080"),
+        redis_url=_env("REDIS_URL", ""),  # Empty: in-memory conversation store
+        llm_cache_dir=_env("LLM_CACHE_DIR", ""),  # Empty: in-memory assistant reply cache
+        llm_api_endpoint=llm_api_endpoint,
+        llm_api_token=llm_api_token,
+        llm_endpoints=llm_endpoints,
+        default_model=_env("DEFAULT_MODEL", "Qwen/Qwen2.5-32B-Instruct"),
+        max_turns=max_turns,
+        conversations_dir=_env("CONVERSATIONS_DIR", "data/conversations"),
+        log_level=_env("LOG_LEVEL", "INFO").upper()
+    )
+
+
+CONFIG: Final[Config] = _load()
 
 # Service URLs
-WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://weaviate:8080")
+API_URL: Final[str] = CONFIG.api_url
+WEAVIATE_URL: Final[str] = CONFIG.weaviate_url
+REDIS_URL: Final[str] = CONFIG.redis_url
+LLM_CACHE_DIR: Final[str] = CONFIG.llm_cache_dir
 
 # External LLM API configuration
-LLM_API_ENDPOINT = os.getenv(
-    "LLM_API_ENDPOINT",
-    "http://host.docker.internal:7000/v1/chat/completions"
-)
-LLM_API_TOKEN = os.getenv("LLM_API_TOKEN", "")
+LLM_API_ENDPOINT: Final[str] = CONFIG.llm_api_endpoint
+LLM_API_TOKEN: Final[str] = CONFIG.llm_api_token
+LLM_ENDPOINTS: Final[tuple[tuple[str, str], ...]] = CONFIG.llm_endpoints
 
 # Model configuration
-DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "Qwen/Qwen2.5-32B-Instruct")
+DEFAULT_MODEL: Final[str] = CONFIG.default_model
+
+# Conversation limits
+MAX_TURNS: Final[int] = CONFIG.max_turns
+CONVERSATIONS_DIR: Final[str] = CONFIG.conversations_dir
+
+# Logging
+LOG_LEVEL: Final[int] = logging.getLevelNamesMapping()[CONFIG.log_level]
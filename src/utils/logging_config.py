@@ -4,17 +4,91 @@ Shared logging configuration for The Grid.
 Provides a consistent logging setup across all scripts and modules.
 """
 
+import atexit
 import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Optional
 
+from utils.config import LOG_LEVEL
 
-def setup_logging(level: int = logging.INFO) -> None:
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the asctime date/time once per second.
+    
+    Output matches logging.Formatter; only the localtime/strftime work is
+    shared by all records logged within the same second.
+    """
+    
+    _cached: tuple[int, str] = (-1, "")
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, text = self._cached
+        if second != cached_second:
+            text = time.strftime(self.default_time_format, self.converter(second))
+            self._cached = (second, text)  # One tuple, so concurrent threads see a consistent pair
+        return self.default_msec_format % (text, record.msecs)
+
+
+# Built once and shared by every handler setup_logging installs
+_FORMATTER = _CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Set by the first setup_logging call; Streamlit re-runs the UI script on every
+# interaction, and reconfiguring would clear every logger's level cache each time
+_CONFIGURED = False
+
+
+def setup_logging(level: int = LOG_LEVEL) -> None:
     """
     Configure logging with consistent format.
     
+    Only the first call in a process has any effect.
+    
+    Args:
+        level: Logging level (default: LOG_LEVEL env, INFO if unset)
+    """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    
+    # The format has no thread or process fields, so skip the per-record
+    # current_thread(), getpid() and multiprocessing lookups LogRecord would
+    # otherwise make
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
+    # Wire the root logger directly rather than via basicConfig; keep any
+    # stream handler a host (test runner, server) already installed
+    root = logging.getLogger()
+    if not any(isinstance(h, logging.StreamHandler) for h in root.handlers):
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(_FORMATTER)
+        
+        # Formatting and the stderr write happen on a listener thread, so
+        # logging callers only enqueue; stopped (and drained) at exit
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
+        root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+    _CONFIGURED = True
+
+
+def log_if(logger: logging.Logger, level: int, build: Callable[[], str]) -> None:
+    """Log a message whose construction is costly, only if the level is enabled.
+    
     Args:
-        level: Logging level (default: INFO)
+        logger: Logger to write to
+        level: Logging level
+        build: Returns the message; not called when the level is disabled
     """
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    if logger.isEnabledFor(level):
+        logger.log(level, build())